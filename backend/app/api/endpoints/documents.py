@@ -1,24 +1,46 @@
 """Document API endpoints."""
 
 import os
+import re
 import uuid
-import shutil
+import logging
 from typing import List, Dict, Any
-from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 import redis
 
 from ...core.config import get_settings
-from ...core.logger import get_logger
+from ...core.logger import ContextLoggerAdapter, get_logger
 from ...schemas import JobResponse, ParserType
-from ...services.redis import redis_service
-from ...services.document import document_service
+from ...services.redis import decode_stream_entry, redis_service
 
 router = APIRouter()
 logger = get_logger(__name__)
+upload_logger = ContextLoggerAdapter(logger, {"service": "api", "endpoint": "upload"})
 settings = get_settings()
 
+_VALID_PARSERS = frozenset(p.value for p in ParserType)
+_INVALID_PARSER_DETAIL = f"Invalid parser type. Choose from {', '.join(p.value for p in ParserType)}"
+_UNSAFE_FILENAME_CHARS = re.compile(r"[\x00-\x1f]")
+
+
+def _safe_filename(filename: str) -> str:
+    """Strip any client-side directory components and control characters from a filename."""
+    return _UNSAFE_FILENAME_CHARS.sub("", os.path.basename((filename or "").replace("\\", "/")))
+
+
+async def _discard_pdfs(job_ids: List[str]) -> None:
+    """Delete the PDFs stored for jobs of a rejected or failed upload."""
+    for job_id in job_ids:
+        try:
+            await redis_service.delete_pdf(job_id)
+        except Exception as e:
+            upload_logger.warning("Failed to delete stored PDF", extra={
+                "job_id": job_id,
+                "error_type": type(e).__name__,
+                "error_message": str(e)
+            })
+
 
 @router.post("/upload", response_model=list, status_code=202)
 async def upload_files(
@@ -34,59 +56,83 @@ async def upload_files(
     
     Returns a list of job IDs and filenames.
     """
-    logger.info("Starting file upload", extra={
-        "service": "api",
-        "endpoint": "upload",
+    upload_logger.info("Starting file upload", extra={
         "file_count": len(files),
         "parser": parser
     })
     
+    # Jobs whose PDF has (partly) been stored, dropped again if the upload fails
+    stored_job_ids = []
+    
     try:
         # Validate parser
-        try:
-            parser_type = ParserType(parser)
-        except ValueError:
-            logger.warning("Invalid parser type received", extra={
-                "service": "api",
-                "endpoint": "upload",
+        if parser not in _VALID_PARSERS:
+            upload_logger.warning("Invalid parser type received", extra={
                 "parser": parser,
                 "error": "invalid_parser"
             })
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Invalid parser type. Choose from {', '.join([p.value for p in ParserType])}"
-            )
+            raise HTTPException(status_code=400, detail=_INVALID_PARSER_DETAIL)
+        parser_type = ParserType(parser)
+        
+        # Validate all filenames before storing anything
+        safe_filenames = [_safe_filename(file.filename) for file in files]
+        for file, safe_filename in zip(files, safe_filenames):
+            if not safe_filename or safe_filename.startswith("."):
+                upload_logger.warning("Invalid file name received", extra={
+                    "file_name": file.filename,
+                    "error": "invalid_filename"
+                })
+                raise HTTPException(status_code=400, detail=f"Invalid file name: {file.filename!r}")
+        
+        # One reusable buffer per request; chunks are forwarded to Redis as memoryview slices
+        buffer = memoryview(bytearray(settings.UPLOAD_CHUNK_SIZE))
         
         job_list = []
-        for file in files:
-            job_id = str(uuid.uuid4())
-            safe_filename = Path(file.filename).name
-            content = await file.read()
-            
-            # Store PDF in Redis
-            redis_service.set_pdf(job_id, content)
-            logger.info("PDF stored in Redis", extra={
-                "service": "api",
-                "endpoint": "upload",
-                "job_id": job_id,
-                "file_name": safe_filename,
-                "file_size": len(content)
-            })
+        for file, safe_filename in zip(files, safe_filenames):
+            job_id = uuid.uuid4().hex
+            stored_job_ids.append(job_id)
+
+            # Stream PDF into Redis chunk by chunk so the full body is never held in memory
+            file_size = 0
+            while chunk_size := await run_in_threadpool(file.file.readinto, buffer):
+                file_size += chunk_size
+                if file_size > settings.MAX_UPLOAD_BYTES:
+                    # Drop this file and any files of the batch that were already stored
+                    await _discard_pdfs(stored_job_ids)
+                    upload_logger.warning("Uploaded file too large", extra={
+                        "job_id": job_id,
+                        "file_name": safe_filename,
+                        "max_upload_bytes": settings.MAX_UPLOAD_BYTES,
+                        "error": "file_too_large"
+                    })
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File {safe_filename} exceeds the maximum upload size of {settings.MAX_UPLOAD_BYTES} bytes"
+                    )
+                await redis_service.append_pdf(job_id, buffer[:chunk_size])
+            if upload_logger.isEnabledFor(logging.DEBUG):
+                upload_logger.debug("PDF stored in Redis", extra={
+                    "job_id": job_id,
+                    "file_name": safe_filename,
+                    "file_size": file_size
+                })
             
-            redis_service.set_job_status(job_id, "pending")
-            redis_service.add_to_stream(
-                settings.DOCUMENT_STREAM,
+            job_list.append({"job_id": job_id, "filename": safe_filename})
+
+        # Mark all jobs pending and enqueue them in a single pipelined round-trip
+        await redis_service.enqueue_jobs(
+            settings.DOCUMENT_STREAM,
+            [
                 {
-                    "job_id": job_id,
+                    "job_id": job["job_id"],
                     "parser": parser_type.value,
-                    "filename": safe_filename
+                    "filename": job["filename"]
                 }
-            )
-            job_list.append({"job_id": job_id, "filename": safe_filename})
-            
-        logger.info("File upload completed", extra={
-            "service": "api",
-            "endpoint": "upload",
+                for job in job_list
+            ]
+        )
+
+        upload_logger.info("File upload completed", extra={
             "job_count": len(job_list),
             "parser": parser
         })
@@ -96,12 +142,12 @@ async def upload_files(
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        logger.error("File upload failed", extra={
-            "service": "api",
-            "endpoint": "upload",
+        upload_logger.error("File upload failed", extra={
             "error_type": type(e).__name__,
             "error_message": str(e)
         }, exc_info=True)
+        # The request failed as a whole, so drop the PDFs stored for any of its jobs
+        await _discard_pdfs(stored_job_ids)
         raise HTTPException(status_code=500, detail=f"Error uploading files: {str(e)}")
 
 
@@ -122,7 +168,7 @@ async def get_status(job_id: str):
     })
     
     try:
-        job_data = redis_service.get_job_status(job_id)
+        job_data = await redis_service.get_job_status(job_id)
         
         if not job_data:
             logger.warning("Job not found", extra={
@@ -165,6 +211,24 @@ async def get_status(job_id: str):
         raise HTTPException(status_code=500, detail=f"Error getting job status: {str(e)}")
 
 
+def _is_missing_stream(error: Exception) -> bool:
+    """Whether a stream command failed because the stream or consumer group does not exist yet."""
+    return "no such key" in str(error).lower()
+
+
+def _decode(value: Any) -> Any:
+    """Decode a bytes reply (entry IDs, names) from the binary-safe Redis client."""
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def _stream_entry(entry: Any) -> List[Any]:
+    """Render an XINFO STREAM first/last entry as [entry ID, decoded job data]."""
+    if not entry:
+        return []
+    entry_id, fields = entry
+    return [_decode(entry_id), decode_stream_entry(fields)]
+
+
 @router.get("/debug/streams", response_model=Dict[str, Any])
 async def debug_streams():
     """
@@ -181,86 +245,66 @@ async def debug_streams():
         
         # Get stream info
         try:
-            stream_info = conn.xinfo_stream(settings.DOCUMENT_STREAM)
+            stream_info = await conn.xinfo_stream(settings.DOCUMENT_STREAM)
         except redis.exceptions.ResponseError as e:
-            if "no such key" in str(e):
+            if _is_missing_stream(e):
                 stream_info = {}
             else:
                 raise
         
         # Get consumer group info
         try:
-            group_info = conn.xinfo_groups(settings.DOCUMENT_STREAM)
+            group_info = await conn.xinfo_groups(settings.DOCUMENT_STREAM)
         except redis.exceptions.ResponseError as e:
-            if "no such key" in str(e):
+            if _is_missing_stream(e):
                 group_info = []
             else:
                 raise
         
         # Get pending messages
         try:
-            pending_messages = conn.xpending(
+            pending_messages = await conn.xpending(
                 settings.DOCUMENT_STREAM,
                 settings.DOCUMENT_CONSUMER_GROUP
             )
         except redis.exceptions.ResponseError as e:
-            if "no such key" in str(e):
-                pending_messages = [0, None, None, []]
+            if _is_missing_stream(e):
+                pending_messages = {"pending": 0, "min": None, "max": None, "consumers": []}
             else:
                 raise
         
-        # Get all job keys
-        job_keys = conn.keys("job:*")
-        
-        # Get job statuses
-        job_statuses = {
-            "pending": [],
-            "processing": [],
-            "done": [],
-            "error": []
-        }
-        
-        for job_key in job_keys:
-            job_id = job_key.decode('utf-8').split(':')[1]
-            job_data = redis_service.get_job_status(job_id)
-            if job_data:
-                status = job_data.get("status", "unknown")
-                if status in job_statuses:
-                    job_statuses[status].append({
-                        "job_id": job_id,
-                        "markdown_length": len(job_data.get("markdown", "")),
-                        "summary_length": len(job_data.get("summary", ""))
-                    })
+        # Get job statuses from the per-status index sets
+        job_statuses = await redis_service.get_jobs_by_status()
         
         # Get Redis info
-        redis_info = conn.info()
+        redis_info = await conn.info()
         
         return {
             "stream_info": {
-                "length": stream_info.get(b"length", 0) if isinstance(stream_info, dict) else 0,
-                "last_generated_id": stream_info.get(b"last-generated-id", b"").decode('utf-8') if isinstance(stream_info, dict) else "",
-                "first_entry": stream_info.get(b"first-entry", []) if isinstance(stream_info, dict) else [],
-                "last_entry": stream_info.get(b"last-entry", []) if isinstance(stream_info, dict) else []
+                "length": stream_info.get("length", 0),
+                "last_generated_id": _decode(stream_info.get("last-generated-id")) or "",
+                "first_entry": _stream_entry(stream_info.get("first-entry")),
+                "last_entry": _stream_entry(stream_info.get("last-entry"))
             },
             "consumer_groups": [
                 {
-                    "name": group[b"name"].decode('utf-8'),
-                    "consumers": group[b"consumers"],
-                    "pending": group[b"pending"],
-                    "last_delivered_id": group[b"last-delivered-id"].decode('utf-8')
+                    "name": _decode(group["name"]),
+                    "consumers": group["consumers"],
+                    "pending": group["pending"],
+                    "last_delivered_id": _decode(group["last-delivered-id"])
                 }
                 for group in group_info
-            ] if group_info else [],
+            ],
             "pending_messages": {
-                "count": pending_messages[0],
-                "min_id": pending_messages[1].decode('utf-8') if pending_messages[1] else None,
-                "max_id": pending_messages[2].decode('utf-8') if pending_messages[2] else None,
+                "count": pending_messages["pending"],
+                "min_id": _decode(pending_messages["min"]),
+                "max_id": _decode(pending_messages["max"]),
                 "consumers": [
                     {
-                        "name": consumer[b"name"].decode('utf-8'),
-                        "count": consumer[b"count"]
+                        "name": _decode(consumer["name"]),
+                        "count": consumer["pending"]
                     }
-                    for consumer in pending_messages[3]
+                    for consumer in pending_messages["consumers"]
                 ]
             },
             "job_statuses": job_statuses,
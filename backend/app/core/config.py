@@ -17,17 +17,78 @@ class Settings(BaseSettings):
     # Redis settings
     REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
     REDIS_PORT: int = int(os.getenv("REDIS_PORT", 6379))
+    # Connections per process; callers wait for a free one when all are in use
+    REDIS_POOL_SIZE: int = int(os.getenv("REDIS_POOL_SIZE", 50))
+    # Seconds a pooled connection may sit idle before it is pinged on checkout
+    REDIS_HEALTH_CHECK_INTERVAL: int = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", 30))
+    
+    # Seconds a successful Redis ping is reused by /health
+    HEALTH_CACHE_S: float = float(os.getenv("HEALTH_CACHE_S", 2.0))
     
     # API Keys
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
     MISTRAL_API_KEY: str = os.getenv("MISTRAL_API_KEY", "")
+    # Maximum concurrent LLM calls per process on the async paths
+    LLM_CONCURRENCY_LIMIT: int = int(os.getenv("LLM_CONCURRENCY_LIMIT", 8))
+    # Seconds cached Gemini responses are kept (7 days)
+    LLM_CACHE_TTL: int = int(os.getenv("LLM_CACHE_TTL", 7 * 24 * 60 * 60))
+    # Return markdown built from the PDF text layer instead of calling Gemini when its
+    # structure score (headings per page, +0.5 with lists) reaches the threshold
+    GEMINI_MD_FAST_PATH: bool = os.getenv("GEMINI_MD_FAST_PATH", "true").lower() == "true"
+    MD_CONFIDENCE_THRESHOLD: float = float(os.getenv("MD_CONFIDENCE_THRESHOLD", 1.0))
+    # Reuse summaries of near-duplicate documents (needs the RediSearch module, e.g. redis-stack)
+    SEMANTIC_CACHE_ENABLED: bool = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.92))
+    # Longer content is summarized in overlapping chunks whose summaries are then combined
+    SUMMARY_CHUNK_CHARS: int = int(os.getenv("SUMMARY_CHUNK_CHARS", 30000))
+    SUMMARY_CHUNK_OVERLAP: int = int(os.getenv("SUMMARY_CHUNK_OVERLAP", 500))
+    # Longer content is cut to its head and tail before summarizing (0 disables)
+    SUMMARY_MAX_CHARS: int = int(os.getenv("SUMMARY_MAX_CHARS", 120000))
+    # Documents up to this many characters are summarized together in one Gemini call
+    SUMMARY_BATCH_MAX_CHARS: int = int(os.getenv("SUMMARY_BATCH_MAX_CHARS", 20000))
+    
+    # PDF text extraction backend: "pymupdf" (native) or "pypdf2" (pure Python fallback)
+    PDF_BACKEND: str = os.getenv("PDF_BACKEND", "pymupdf")
+    # Processes used to extract large PDFs in parallel (1 disables) and the page count that triggers it
+    PDF_EXTRACT_WORKERS: int = int(os.getenv("PDF_EXTRACT_WORKERS", min(4, os.cpu_count() or 1)))
+    PDF_PARALLEL_MIN_PAGES: int = int(os.getenv("PDF_PARALLEL_MIN_PAGES", 32))
     
     # File storage
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads")
+    MAX_UPLOAD_BYTES: int = int(os.getenv("MAX_UPLOAD_BYTES", 100 * 1024 * 1024))
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", 1 << 20))
+    # PDFs at least this large are stored in Redis as a list of chunks of this size
+    PDF_CHUNK_SIZE: int = int(os.getenv("PDF_CHUNK_SIZE", 1 << 20))
+    # Seconds an unprocessed PDF is kept in Redis or under PDF_STORE_DIR (1 day)
+    PDF_TTL: int = int(os.getenv("PDF_TTL", 24 * 60 * 60))
+    # Seconds a finished (done/error) job is kept in Redis (7 days, 0 keeps it forever)
+    JOB_TTL: int = int(os.getenv("JOB_TTL", 7 * 24 * 60 * 60))
+    # Shared directory (e.g. a tmpfs volume mounted by API and workers) to keep uploaded
+    # PDFs in instead of Redis; empty keeps them in Redis
+    PDF_STORE_DIR: str = os.getenv("PDF_STORE_DIR", "")
+    
+    # Store large job markdown/summary values zstd-compressed in Redis
+    COMPRESS_JOB_BLOBS: bool = os.getenv("COMPRESS_JOB_BLOBS", "true").lower() == "true"
     
     # Redis streams
     DOCUMENT_STREAM: str = "documents"
     DOCUMENT_CONSUMER_GROUP: str = "document_processors"
+    # Approximate stream length cap; trimming drops the oldest entries even if unread,
+    # so keep it well above the expected backlog
+    STREAM_MAXLEN: int = int(os.getenv("STREAM_MAXLEN", 100_000))
+    # Stream entries a worker reads and summarizes per batch
+    WORKER_BATCH_SIZE: int = int(os.getenv("WORKER_BATCH_SIZE", 8))
+    # Consumers each worker process runs concurrently on its event loop
+    WORKER_CONCURRENCY: int = int(os.getenv("WORKER_CONCURRENCY", 4))
+    # Comma-separated CPU ids the worker process (and its extract pool) is pinned to; empty disables
+    WORKER_CPUS: str = os.getenv("WORKER_CPUS", "")
+    # Entries left unacknowledged this long (e.g. by a crashed worker) are claimed by
+    # another worker, which checks for them every STREAM_CLAIM_INTERVAL_S seconds;
+    # entries of jobs that were finished meanwhile are only acknowledged
+    STREAM_CLAIM_MIN_IDLE_MS: int = int(os.getenv("STREAM_CLAIM_MIN_IDLE_MS", 5 * 60 * 1000))
+    STREAM_CLAIM_INTERVAL_S: float = float(os.getenv("STREAM_CLAIM_INTERVAL_S", 30.0))
+    # Seconds between removals of stream entries all consumer groups have acknowledged
+    STREAM_TRIM_INTERVAL_S: float = float(os.getenv("STREAM_TRIM_INTERVAL_S", 60.0))
     
     class Config:
         """Config for Pydantic settings."""
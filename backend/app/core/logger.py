@@ -1,19 +1,35 @@
 """Logger configuration."""
 
-import json
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
-from datetime import datetime
-from typing import Any, Dict, List
+import time
+from functools import lru_cache
 from pathlib import Path
 
+import orjson
+
+# Attributes every LogRecord carries; anything else was passed via ``extra=``
+LOG_RESERVED = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+@lru_cache(maxsize=1)
+def _format_utc_seconds(seconds: int) -> str:
+    """Format whole UTC seconds; cached since consecutive records share a second."""
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+
+
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging."""
-    
+
     def format(self, record: logging.LogRecord) -> str:
         """Format log record as JSON."""
+        created = record.created
+        seconds = int(created)
         log_data = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": f"{_format_utc_seconds(seconds)}.{int((created - seconds) * 1e6):06d}",
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -21,7 +37,7 @@ class JSONFormatter(logging.Formatter):
             "function": record.funcName,
             "line": record.lineno,
         }
-        
+
         # Add exception info if present
         if record.exc_info:
             log_data["exception"] = {
@@ -29,31 +45,64 @@ class JSONFormatter(logging.Formatter):
                 "message": str(record.exc_info[1]),
                 "traceback": self.formatException(record.exc_info)
             }
-            
-        # Add extra fields if present
-        if hasattr(record, "extra"):
-            log_data.update(record.extra)
-            
-        return json.dumps(log_data)
+
+        # Add extra fields; logging merges ``extra=`` into the record's attributes
+        for key, value in record.__dict__.items():
+            if key not in LOG_RESERVED:
+                log_data[key] = value
+
+        return orjson.dumps(log_data, default=str).decode()
+
+class ContextLoggerAdapter(logging.LoggerAdapter):
+    """Logger adapter that merges static context into each call's extra fields."""
+
+    def process(self, msg, kwargs):
+        """Merge the adapter's context with per-call extra fields (per-call values win)."""
+        extra = kwargs.get("extra")
+        kwargs["extra"] = {**self.extra, **extra} if extra else self.extra
+        return msg, kwargs
+
+@lru_cache(maxsize=1)
+def _get_file_log_queue() -> queue.SimpleQueue:
+    """
+    Get the queue feeding the persistent log file.
+
+    Records are formatted by the caller and handed to a background
+    QueueListener, so the file write and flush happen off the request thread.
+    The listener is created once per process and stopped at exit.
+
+    API workers and extraction pool processes all append to the same file,
+    so none of them rotates it: rotate logs/app.log externally (e.g. with
+    logrotate) and each process reopens the file once it has been moved.
+    """
+    log_dir = Path("logs")
+    log_dir.mkdir(exist_ok=True)
+    file_handler = logging.handlers.WatchedFileHandler(log_dir / "app.log")
+    # Records arrive already rendered as JSON by the QueueHandler
+    file_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    return log_queue
 
 def get_logger(name: str) -> logging.Logger:
     """Get a logger with the given name configured for structured logging."""
     logger = logging.getLogger(name)
-    
+
     # Only add handlers if they haven't been added yet
     if not logger.handlers:
         logger.setLevel(logging.INFO)
-        
+
         # Console handler with JSON formatting
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setFormatter(JSONFormatter())
         logger.addHandler(console_handler)
-        
-        # File handler for persistent logs
-        log_dir = Path("logs")
-        log_dir.mkdir(exist_ok=True)
-        file_handler = logging.FileHandler(log_dir / "app.log")
-        file_handler.setFormatter(JSONFormatter())
-        logger.addHandler(file_handler)
-    
-    return logger 
\ No newline at end of file
+
+        # File handler for persistent logs, written by a background listener
+        queue_handler = logging.handlers.QueueHandler(_get_file_log_queue())
+        queue_handler.setFormatter(JSONFormatter())
+        logger.addHandler(queue_handler)
+
+    return logger
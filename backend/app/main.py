@@ -1,7 +1,7 @@
 """Main FastAPI application."""
 
 import os
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import time
@@ -45,21 +45,36 @@ app.add_middleware(
 app.include_router(api_router, prefix=settings.API_V1_STR)
 logger.info("API router configured", extra={"api_prefix": settings.API_V1_STR})
 
-# Instrument FastAPI with Prometheus metrics
-Instrumentator().instrument(app).expose(app, include_in_schema=False, should_gzip=True)
+# Instrument FastAPI with Prometheus metrics. Only templated routes are labelled
+# (e.g. /documents/{job_id}) so label cardinality stays bounded, and scrapes are
+# served uncompressed to avoid gzipping every frequent poll.
+Instrumentator(
+    should_group_status_codes=True,
+    should_ignore_untemplated=True,
+    should_group_untemplated=True,
+    excluded_handlers=["/health", "/metrics"],
+).instrument(app).expose(app, include_in_schema=False, should_gzip=False)
 logger.info("Prometheus metrics instrumentation configured")
 
+# Paths excluded from request logging
+UNLOGGED_PATHS = frozenset({"/health", "/health/deep", "/metrics", "/docs", "/openapi.json", "/redoc"})
+
 # Add middleware for request logging and timing
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     """Log request information and timing."""
-    start_time = time.time()
+    # Health checks, metrics scrapes and API docs are frequent and not worth logging
+    if request.url.path in UNLOGGED_PATHS:
+        return await call_next(request)
+    
+    start_time = time.perf_counter()
     
     # Get client IP and method + path
     client_host = request.client.host if request.client else "unknown"
     method = request.method
     path = request.url.path
     query_params = str(request.query_params)
+    request_id = request.headers.get("X-Request-ID", "unknown")
     
     # Log request start with context
     logger.info("Request started", extra={
@@ -67,23 +82,23 @@ async def log_requests(request: Request, call_next):
         "path": path,
         "client_host": client_host,
         "query_params": query_params,
-        "request_id": request.headers.get("X-Request-ID", "unknown")
+        "request_id": request_id
     })
     
     try:
         response = await call_next(request)
         
         # Calculate processing time
-        process_time = time.time() - start_time
-        response.headers["X-Process-Time"] = str(process_time)
+        process_time = f"{time.perf_counter() - start_time:.4f}"
+        response.headers["X-Process-Time"] = process_time
         
         # Log successful request completion
         logger.info("Request completed", extra={
             "method": method,
             "path": path,
             "status_code": response.status_code,
-            "process_time": f"{process_time:.4f}s",
-            "request_id": request.headers.get("X-Request-ID", "unknown")
+            "process_time": f"{process_time}s",
+            "request_id": request_id
         })
         
         return response
@@ -94,7 +109,7 @@ async def log_requests(request: Request, call_next):
             "path": path,
             "error_type": type(e).__name__,
             "error_message": str(e),
-            "request_id": request.headers.get("X-Request-ID", "unknown")
+            "request_id": request_id
         }, exc_info=True)
         
         return JSONResponse(
@@ -115,17 +130,23 @@ async def root():
     }
 
 
-# Health check endpoint
-@app.get("/health")
-async def health_check():
-    """Health check endpoint for monitoring."""
-    logger.debug("Health check initiated")
+# Time of the last successful Redis ping, shared by /health requests
+_HEALTH = {"ok": False, "t": 0.0}
+
+
+async def _check_redis(use_cache: bool):
+    """Ping Redis, reusing a recent successful result when use_cache is set."""
+    if use_cache and _HEALTH["ok"] and time.monotonic() - _HEALTH["t"] < settings.HEALTH_CACHE_S:
+        return {"status": "healthy", "redis": "connected"}
+    
     try:
         # Verify Redis connection
-        redis_service.connection.ping()
+        await redis_service.connection.ping()
+        _HEALTH["ok"], _HEALTH["t"] = True, time.monotonic()
         logger.info("Health check successful", extra={"redis_status": "connected"})
         return {"status": "healthy", "redis": "connected"}
     except Exception as e:
+        _HEALTH["ok"] = False
         logger.error("Health check failed", extra={
             "redis_status": "disconnected",
             "error_type": type(e).__name__,
@@ -134,4 +155,20 @@ async def health_check():
         return JSONResponse(
             status_code=503,
             content={"status": "unhealthy", "redis": "disconnected", "error": str(e)}
-        ) 
\ No newline at end of file
+        )
+
+
+# Health check endpoint
+@app.get("/health")
+async def health_check():
+    """Health check endpoint for monitoring; Redis status is cached for HEALTH_CACHE_S seconds."""
+    logger.debug("Health check initiated")
+    return await _check_redis(use_cache=True)
+
+
+# Deep health check endpoint
+@app.get("/health/deep")
+async def deep_health_check():
+    """Health check endpoint that always pings Redis."""
+    logger.debug("Deep health check initiated")
+    return await _check_redis(use_cache=False)
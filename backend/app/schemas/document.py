@@ -6,11 +6,11 @@ from .parser import ParserType
 
 
 class DocumentJob(BaseModel):
-    """Schema for document job data."""
+    """Schema for document job data (one document stream entry)."""
     
     job_id: str = Field(..., description="Unique identifier for the job")
     parser: ParserType = Field(..., description="Parser to use for processing")
-    filepath: str = Field(..., description="Path to the uploaded file")
+    filename: str = Field(..., description="Name of the uploaded file; its bytes are stored in Redis")
 
 
 class JobResponse(BaseModel):
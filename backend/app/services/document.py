@@ -1,30 +1,318 @@
 """Document processing service."""
 
 import os
+import re
+import asyncio
+import hashlib
+import multiprocessing
+from array import array
+import orjson
 import PyPDF2
+import pymupdf
 import google.generativeai as genai
 from mistralai.client import MistralClient
+from mistralai.async_client import MistralAsyncClient
 from mistralai.models.chat_completion import ChatMessage
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
 from ..core.config import get_settings
 from ..core.logger import get_logger
 from ..schemas import ParserType
+from .redis import redis_service
 
 logger = get_logger(__name__)
 settings = get_settings()
 
 
+# In-memory PDF contents accepted by the parsers alongside paths and file objects
+PDF_BUFFER_TYPES = (bytes, bytearray, memoryview)
+
+
+class FallbackText(str):
+    """
+    Parser result that is not the parser's own output.
+
+    Returned in place of the requested extraction when it could not run,
+    e.g. the stub used without an API key or the raw text used after an API
+    error, so callers can tell it apart and avoid caching it.
+    """
+
+
+@lru_cache(maxsize=1)
+def _get_extract_pool() -> ProcessPoolExecutor:
+    """
+    Get the process pool used for parallel page extraction.
+
+    PyMuPDF is not thread-safe and holds the GIL, so pages are split across
+    processes rather than threads. Spawned (not forked) workers avoid
+    inheriting the parent's threads and open sockets.
+    """
+    return ProcessPoolExecutor(
+        max_workers=settings.PDF_EXTRACT_WORKERS,
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def warm_up_extract_pool() -> None:
+    """
+    Start all page-extraction processes ahead of the first large PDF.
+
+    Spawned workers boot lazily and import the application on startup, so
+    without this the first document over PDF_PARALLEL_MIN_PAGES pays for
+    process creation on top of its extraction.
+    """
+    if settings.PDF_EXTRACT_WORKERS > 1:
+        list(_get_extract_pool().map(abs, range(settings.PDF_EXTRACT_WORKERS)))
+
+
+def _load_pdf_bytes(file_obj):
+    """Return the PDF contents of a path, file object or in-memory buffer."""
+    if isinstance(file_obj, PDF_BUFFER_TYPES):
+        return file_obj
+    if isinstance(file_obj, (str, os.PathLike)):
+        with open(file_obj, "rb") as f:
+            return f.read()
+    if hasattr(file_obj, "seek"):
+        file_obj.seek(0)
+    return file_obj.read()
+
+
+def _read_page_range_pymupdf(pdf_bytes: bytes, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) with PyMuPDF; runs in a pool worker."""
+    with pymupdf.open(stream=pdf_bytes, filetype="pdf") as doc:
+        return [doc[page_num].get_text("text") for page_num in range(start, stop)]
+
+
+def _read_pages_pymupdf(file_obj) -> List[str]:
+    """
+    Extract the text of each page with PyMuPDF (native MuPDF parser).
+
+    Documents with at least settings.PDF_PARALLEL_MIN_PAGES pages are split
+    into contiguous page ranges extracted by the process pool; smaller ones
+    are not worth the inter-process overhead.
+    """
+    pdf_bytes = _load_pdf_bytes(file_obj)
+    
+    with pymupdf.open(stream=pdf_bytes, filetype="pdf") as doc:
+        page_count = doc.page_count
+        if settings.PDF_EXTRACT_WORKERS <= 1 or page_count < settings.PDF_PARALLEL_MIN_PAGES:
+            return [page.get_text("text") for page in doc]
+    
+    if isinstance(pdf_bytes, memoryview):
+        # Pool workers receive pickled arguments, which memoryviews cannot be
+        pdf_bytes = pdf_bytes.tobytes()
+    workers = min(settings.PDF_EXTRACT_WORKERS, page_count)
+    bounds = [page_count * i // workers for i in range(workers + 1)]
+    page_ranges = _get_extract_pool().map(
+        _read_page_range_pymupdf,
+        [pdf_bytes] * workers,
+        bounds[:-1],
+        bounds[1:]
+    )
+    return [page_text for page_range in page_ranges for page_text in page_range]
+
+
+# Lines whose font is this much larger than the body text are treated as headings
+HEADING_SIZE_RATIO = 1.2
+_BULLET = re.compile(r"^[\u2022\u25aa\u25e6\u25cf*-]\s+")
+_NUMBERED_ITEM = re.compile(r"^\d+[.)]\s+")
+
+
+def _structured_markdown_pymupdf(pdf_bytes) -> Tuple[str, float]:
+    """
+    Build markdown from the PDF's own text layer using font-size heuristics.
+
+    The font size covering most characters is taken as body text; larger
+    sizes become up to three heading levels, and bullet/numbered lines
+    become list items.
+
+    Returns:
+        (markdown, confidence) where confidence is headings per page plus
+        0.5 when lists were found; 0.0 for PDFs without a text layer
+    """
+    with pymupdf.open(stream=pdf_bytes, filetype="pdf") as doc:
+        page_count = doc.page_count
+        pages = [page.get_text("dict", flags=pymupdf.TEXTFLAGS_TEXT)["blocks"] for page in doc]
+    
+    # Each block becomes a list of (text, font size) lines
+    blocks = []
+    size_chars = Counter()
+    for page_blocks in pages:
+        for block in page_blocks:
+            lines = []
+            for line in block.get("lines", []):
+                text = "".join(span["text"] for span in line["spans"]).strip()
+                if text:
+                    size = round(max(span["size"] for span in line["spans"]))
+                    size_chars[size] += len(text)
+                    lines.append((text, size))
+            if lines:
+                blocks.append(lines)
+    if not size_chars:
+        return "", 0.0
+    
+    body_size = size_chars.most_common(1)[0][0]
+    heading_sizes = sorted((size for size in size_chars if size >= body_size * HEADING_SIZE_RATIO), reverse=True)
+    heading_prefix = {size: "#" * level for level, size in enumerate(heading_sizes[:3], start=1)}
+    
+    parts = []
+    headings = list_items = 0
+    for lines in blocks:
+        paragraph = []
+        for text, size in lines:
+            if size in heading_prefix:
+                if paragraph:
+                    parts.append("\n".join(paragraph))
+                    paragraph = []
+                parts.append(f"{heading_prefix[size]} {text}")
+                headings += 1
+            elif _BULLET.match(text):
+                paragraph.append(_BULLET.sub("- ", text, count=1))
+                list_items += 1
+            else:
+                if _NUMBERED_ITEM.match(text):
+                    list_items += 1
+                paragraph.append(text)
+        if paragraph:
+            parts.append("\n".join(paragraph))
+    
+    confidence = headings / max(page_count, 1) + (0.5 if list_items else 0.0)
+    return "\n\n".join(parts) + "\n", confidence
+
+
+def _read_pages_pypdf2(file_obj) -> List[str]:
+    """Extract the text of each page with PyPDF2 (pure Python fallback)."""
+    if isinstance(file_obj, PDF_BUFFER_TYPES):
+        file_obj = BytesIO(file_obj)
+    reader = PyPDF2.PdfReader(file_obj)
+    return [page.extract_text() for page in reader.pages]
+
+
+GEMINI_MODEL = "gemini-2.0-flash"
+
+# Embeddings used by the semantic summary cache
+EMBEDDING_MODEL = "models/text-embedding-004"
+EMBEDDING_DIM = 768
+EMBEDDING_INPUT_CHARS = 8000
+
+# Bump when a prompt changes so cached responses for the old prompt are not reused
+MARKDOWN_PROMPT_VERSION = "v2"
+SUMMARY_PROMPT_VERSION = "v2"
+
+
+def _llm_cache_key(method: str, prompt_version: str, text: str) -> str:
+    """Build a deterministic cache key for an LLM request."""
+    return hashlib.sha256(f"{method}|{GEMINI_MODEL}|{prompt_version}|{text}".encode("utf-8")).hexdigest()
+
+
+# Static prompt text, built once; only the document body is appended per call.
+# Kept free of indentation and trailing blanks, which would be billed as input tokens.
+_MD_PROMPT_PREFIX = (
+    "Convert the following PDF content to well-structured markdown. "
+    "Create headers, lists, and proper formatting:\n\n"
+)
+_SUMMARY_PROMPT_PREFIX = (
+    "Provide a concise summary of the following document content. "
+    "Focus on the key points and main ideas:\n\n"
+)
+_BATCH_SUMMARY_PROMPT_PREFIX = (
+    "Provide a concise summary of each of the following documents. "
+    "Focus on the key points and main ideas.\n"
+    'Return strict JSON: [{"id": "<document id>", "summary": "<summary>"}], one object per input document.\n\n'
+    "Inputs:\n"
+)
+_PROMPT_SUFFIX = "\n"
+
+
+def _markdown_prompt(raw_text: str) -> str:
+    """Build the Gemini prompt converting extracted PDF text to markdown."""
+    return _MD_PROMPT_PREFIX + raw_text + _PROMPT_SUFFIX
+
+
+def _summary_prompt(content: str) -> str:
+    """Build the Gemini prompt summarizing document content."""
+    return _SUMMARY_PROMPT_PREFIX + content + _PROMPT_SUFFIX
+
+
+def _trim_for_summary(content: str) -> str:
+    """
+    Cap content at settings.SUMMARY_MAX_CHARS characters for summarization.
+
+    Longer content keeps its head and tail, which carry the introduction and
+    conclusions, and drops the middle.
+    """
+    max_chars = settings.SUMMARY_MAX_CHARS
+    if max_chars <= 0 or len(content) <= max_chars:
+        return content
+    half = max_chars // 2
+    return content[:half] + "\n...\n" + content[-half:]
+
+
+def _chunk_text(text: str, max_chars: int, overlap: int) -> List[str]:
+    """
+    Split text into windows of at most max_chars characters.
+
+    Consecutive windows share overlap characters, and each window ends at
+    a paragraph or line break in its second half when there is one.
+    """
+    chunks = []
+    start = 0
+    while len(text) - start > max_chars:
+        end = start + max_chars
+        cut = text.rfind("\n\n", start + max_chars // 2, end)
+        if cut == -1:
+            cut = text.rfind("\n", start + max_chars // 2, end)
+        if cut == -1:
+            cut = end
+        chunks.append(text[start:cut])
+        start = max(cut - overlap, start + 1)
+    chunks.append(text[start:])
+    return chunks
+
+
+def _batch_summary_prompt(contents: List[Tuple[str, str]]) -> str:
+    """Build the Gemini prompt summarizing several documents into one JSON array."""
+    documents = orjson.dumps([{"id": doc_id, "text": content} for doc_id, content in contents]).decode()
+    return _BATCH_SUMMARY_PROMPT_PREFIX + documents + _PROMPT_SUFFIX
+
+
+def _ocr_messages(raw_text: str) -> List[ChatMessage]:
+    """Build the Mistral chat messages enhancing extracted PDF text."""
+    return [
+        ChatMessage(role="system", content="You are an OCR enhancement service. Improve the text extraction by fixing any OCR errors and formatting issues."),
+        ChatMessage(role="user", content=f"Please enhance this extracted text, fixing any OCR errors and improving formatting:\n\n{raw_text}")
+    ]
+
+
 class DocumentService:
     """Service for document processing operations."""
     
     def __init__(self):
         """Initialize document service."""
-        self.upload_dir = settings.UPLOAD_DIR
+        # Caps in-flight LLM calls made through the async parser/summary paths
+        self.llm_semaphore = asyncio.Semaphore(settings.LLM_CONCURRENCY_LIMIT)
         
-        # Ensure upload directory exists
-        os.makedirs(self.upload_dir, exist_ok=True)
+        # Gemini model client, created on first use and shared by all calls
+        self._gemini_model = None
+        
+        # Parser functions by parser type, for sync (False) and async (True) callers
+        self._parser_funcs = {
+            False: {
+                ParserType.PYPDF: self.extract_with_pypdf,
+                ParserType.GEMINI: self.extract_with_gemini,
+                ParserType.MISTRAL: self.extract_with_mistral,
+            },
+            True: {
+                ParserType.PYPDF: self.extract_with_pypdf_async,
+                ParserType.GEMINI: self.extract_with_gemini_async,
+                ParserType.MISTRAL: self.extract_with_mistral_async,
+            },
+        }
         
         # Configure Gemini API if key is available
         if settings.GEMINI_API_KEY:
@@ -44,6 +332,7 @@ class DocumentService:
         # Configure Mistral API if key is available
         if settings.MISTRAL_API_KEY:
             self.mistral_client = MistralClient(api_key=settings.MISTRAL_API_KEY)
+            self.mistral_async_client = MistralAsyncClient(api_key=settings.MISTRAL_API_KEY)
             logger.info("Mistral API configured", extra={
                 "service": "document",
                 "api": "mistral",
@@ -51,18 +340,27 @@ class DocumentService:
             })
         else:
             self.mistral_client = None
+            self.mistral_async_client = None
             logger.warning("Mistral API key not configured", extra={
                 "service": "document",
                 "api": "mistral",
                 "status": "not_configured"
             })
     
+    @property
+    def gemini_model(self) -> genai.GenerativeModel:
+        """Get or create the shared Gemini model client."""
+        if self._gemini_model is None:
+            self._gemini_model = genai.GenerativeModel(model_name=GEMINI_MODEL)
+        return self._gemini_model
+    
     def extract_with_pypdf(self, file_obj) -> str:
         """
-        Extract text from PDF using PyPDF2.
+        Extract text from PDF using PyMuPDF, or PyPDF2 when
+        settings.PDF_BACKEND is "pypdf2".
         
         Args:
-            file_obj: File-like object (BytesIO or file)
+            file_obj: File-like object (BytesIO or file), path, or PDF bytes
             
         Returns:
             Extracted text
@@ -70,20 +368,25 @@ class DocumentService:
         logger.info("Starting PDF extraction with PyPDF", extra={
             "service": "document",
             "parser": "pypdf",
-            "operation": "extract"
+            "operation": "extract",
+            "backend": settings.PDF_BACKEND
         })
         try:
-            text = ""
-            reader = PyPDF2.PdfReader(file_obj)
-            for page_num, page in enumerate(reader.pages):
-                page_text = page.extract_text()
-                text += f"--- Page {page_num + 1} ---\n\n{page_text}\n\n"
+            if settings.PDF_BACKEND == "pypdf2":
+                page_texts = _read_pages_pypdf2(file_obj)
+            else:
+                page_texts = _read_pages_pymupdf(file_obj)
+            
+            text = "".join(
+                f"--- Page {page_num + 1} ---\n\n{page_text}\n\n"
+                for page_num, page_text in enumerate(page_texts)
+            )
             
             logger.info("PDF extraction completed", extra={
                 "service": "document",
                 "parser": "pypdf",
                 "operation": "extract",
-                "pages": len(reader.pages),
+                "pages": len(page_texts),
                 "text_length": len(text)
             })
             return text
@@ -97,12 +400,45 @@ class DocumentService:
             }, exc_info=True)
             raise
     
+    def _try_structured_markdown(self, pdf_bytes) -> Optional[str]:
+        """
+        Get markdown from the PDF's text layer when it is structured enough.
+        
+        Args:
+            pdf_bytes: PDF contents
+            
+        Returns:
+            Markdown, or None if the fast path is disabled or the structure
+            score is below settings.MD_CONFIDENCE_THRESHOLD (Gemini is needed)
+        """
+        if not settings.GEMINI_MD_FAST_PATH:
+            return None
+        markdown, confidence = _structured_markdown_pymupdf(pdf_bytes)
+        if confidence < settings.MD_CONFIDENCE_THRESHOLD:
+            logger.info("PDF structure too weak, using Gemini", extra={
+                "service": "document",
+                "parser": "gemini",
+                "operation": "extract",
+                "path": "gemini",
+                "confidence": confidence
+            })
+            return None
+        logger.info("PDF extraction completed from structured text", extra={
+            "service": "document",
+            "parser": "gemini",
+            "operation": "extract",
+            "path": "structured_text",
+            "confidence": confidence,
+            "markdown_length": len(markdown)
+        })
+        return markdown
+    
     def extract_with_gemini(self, file_obj) -> str:
         """
         Extract and convert PDF to markdown using Google Gemini.
         
         Args:
-            file_obj: File-like object (BytesIO or file)
+            file_obj: File-like object (BytesIO or file), path, or PDF bytes
             
         Returns:
             Markdown-formatted content
@@ -123,20 +459,16 @@ class DocumentService:
             raise ValueError("Gemini API key not configured")
         
         try:
-            # First extract text with PyPDF2
-            raw_text = self.extract_with_pypdf(file_obj)
-            
-            # Use Gemini to convert to markdown
-            model = genai.GenerativeModel(model_name="gemini-2.0-flash")
-            
-            prompt = f"""
-            Convert the following PDF content to well-structured markdown. 
-            Create headers, lists, and proper formatting:
+            pdf_bytes = _load_pdf_bytes(file_obj)
+            markdown = self._try_structured_markdown(pdf_bytes)
+            if markdown is not None:
+                return markdown
             
-            {raw_text}
-            """
+            # First extract the raw text
+            raw_text = self.extract_with_pypdf(pdf_bytes)
             
-            response = model.generate_content(prompt)
+            # Use Gemini to convert to markdown
+            response = self.gemini_model.generate_content(_markdown_prompt(raw_text))
             logger.info("PDF extraction completed with Gemini", extra={
                 "service": "document",
                 "parser": "gemini",
@@ -162,9 +494,10 @@ class DocumentService:
         Otherwise, returns a stubbed string for testing.
         
         Args:
-            file_obj: File-like object (BytesIO or file)
+            file_obj: File-like object (BytesIO or file), path, or PDF bytes
         Returns:
-            Extracted text (real OCR output or stubbed)
+            Extracted text (real OCR output, or a FallbackText with the raw
+            text or stub)
         """
         logger.info("Starting PDF extraction with Mistral", extra={
             "service": "document",
@@ -179,21 +512,16 @@ class DocumentService:
                 "operation": "extract",
                 "mode": "stubbed"
             })
-            return "[Stubbed Mistral OCR output for testing]"
+            return FallbackText("[Stubbed Mistral OCR output for testing]")
+        
+        # First extract the raw text; it doubles as the fallback result
+        raw_text = self.extract_with_pypdf(file_obj)
         
         try:
-            # First extract text with PyPDF2 as fallback
-            raw_text = self.extract_with_pypdf(file_obj)
-            
             # Use Mistral to enhance the text with OCR capabilities
-            messages = [
-                ChatMessage(role="system", content="You are an OCR enhancement service. Improve the text extraction by fixing any OCR errors and formatting issues."),
-                ChatMessage(role="user", content=f"Please enhance this extracted text, fixing any OCR errors and improving formatting:\n\n{raw_text}")
-            ]
-            
             chat_response = self.mistral_client.chat(
                 model="mistral-tiny",  # Using tiny model for OCR enhancement
-                messages=messages
+                messages=_ocr_messages(raw_text)
             )
             
             enhanced_text = chat_response.choices[0].message.content
@@ -214,19 +542,27 @@ class DocumentService:
                 "error_type": type(e).__name__,
                 "error_message": str(e)
             }, exc_info=True)
-            # Fallback to PyPDF2 extraction if Mistral fails
+            # Fall back to the already extracted text if Mistral fails
             logger.info("Falling back to PyPDF2 extraction", extra={
                 "service": "document",
                 "parser": "mistral",
                 "operation": "fallback",
                 "fallback_parser": "pypdf"
             })
-            return self.extract_with_pypdf(file_obj)
+            return FallbackText(raw_text)
+    
+    def _summarize_chunk(self, text: str) -> str:
+        """Summarize a piece of text with a single Gemini call."""
+        return self.gemini_model.generate_content(_summary_prompt(text)).text
     
     def summarize_with_gemini(self, content: str) -> str:
         """
         Summarize content using Google Gemini.
         
+        Content longer than settings.SUMMARY_CHUNK_CHARS is split into
+        overlapping chunks that are summarized in parallel, and the chunk
+        summaries are then summarized together.
+        
         Args:
             content: Content to summarize
             
@@ -248,23 +584,302 @@ class DocumentService:
             raise ValueError("Gemini API key not configured")
         
         try:
-            model = genai.GenerativeModel(model_name="gemini-2.0-flash")
+            content = _trim_for_summary(content)
+            if len(content) <= settings.SUMMARY_CHUNK_CHARS:
+                summary = self._summarize_chunk(content)
+            else:
+                # Map: summarize the chunks concurrently; reduce: summarize their summaries
+                chunks = _chunk_text(content, settings.SUMMARY_CHUNK_CHARS, settings.SUMMARY_CHUNK_OVERLAP)
+                with ThreadPoolExecutor(max_workers=min(len(chunks), 5)) as executor:
+                    partials = list(executor.map(self._summarize_chunk, chunks))
+                summary = self._summarize_chunk("\n\n".join(partials))
+            logger.info("Content summarization completed", extra={
+                "service": "document",
+                "operation": "summarize",
+                "input_length": len(content),
+                "summary_length": len(summary)
+            })
+            return summary
+        except Exception as e:
+            logger.error("Content summarization failed", extra={
+                "service": "document",
+                "operation": "summarize",
+                "error_type": type(e).__name__,
+                "error_message": str(e)
+            }, exc_info=True)
+            raise
+    
+    async def extract_with_pypdf_async(self, file_obj) -> str:
+        """
+        Extract text from PDF without blocking the event loop.
+        
+        Args:
+            file_obj: File-like object (BytesIO or file), path, or PDF bytes
+            
+        Returns:
+            Extracted text
+        """
+        return await asyncio.to_thread(self.extract_with_pypdf, file_obj)
+    
+    async def _generate_with_gemini_cached(self, cache_key: str, prompt: str) -> str:
+        """
+        Call Gemini asynchronously, reusing a cached response for the same key.
+        
+        Cache failures are logged and treated as misses so Redis problems
+        never fail a document.
+        """
+        try:
+            cached = await redis_service.get_llm_cache(cache_key)
+        except Exception:
+            # Already logged by RedisService
+            cached = None
+        if cached is not None:
+            logger.info("Using cached Gemini response", extra={
+                "service": "document",
+                "operation": "llm_cache",
+                "cache_key": cache_key
+            })
+            return cached
+        
+        async with self.llm_semaphore:
+            response = await self.gemini_model.generate_content_async(prompt)
+        
+        try:
+            await redis_service.set_llm_cache(cache_key, response.text)
+        except Exception:
+            # Already logged by RedisService; the response is still usable
+            pass
+        return response.text
+    
+    async def _semantic_cache_lookup(self, text: str) -> Tuple[Optional[str], Optional[bytes]]:
+        """
+        Look up a summary cached for content similar to text.
+        
+        The content is embedded once and matched against the summary vector
+        index; the stored summary is reused when the cosine similarity of the
+        nearest neighbour exceeds settings.SEMANTIC_CACHE_THRESHOLD. Errors
+        are logged and treated as misses.
+        
+        Args:
+            text: Content to summarize
+            
+        Returns:
+            (cached summary or None, embedding to store the new summary under or None)
+        """
+        try:
+            result = await asyncio.to_thread(
+                genai.embed_content,
+                model=EMBEDDING_MODEL,
+                content=text[:EMBEDDING_INPUT_CHARS]
+            )
+            vec = array("f", result["embedding"]).tobytes()
+        except Exception as e:
+            logger.warning("Content embedding failed, skipping semantic cache", extra={
+                "service": "document",
+                "operation": "semantic_cache",
+                "error_type": type(e).__name__,
+                "error_message": str(e)
+            })
+            return None, None
+        
+        try:
+            match = await redis_service.find_similar_summary(vec, EMBEDDING_DIM)
+        except Exception:
+            # Already logged by RedisService
+            return None, vec
+        if match is not None and match[1] > settings.SEMANTIC_CACHE_THRESHOLD:
+            logger.info("Using semantically cached summary", extra={
+                "service": "document",
+                "operation": "semantic_cache",
+                "similarity": match[1]
+            })
+            return match[0], vec
+        return None, vec
+    
+    async def extract_with_gemini_async(self, file_obj) -> str:
+        """
+        Extract and convert PDF to markdown using Google Gemini's async API.
+        
+        Text extraction runs in a worker thread and the Gemini call is
+        awaited under llm_semaphore, so many documents can be in flight at once.
+        
+        Args:
+            file_obj: File-like object (BytesIO or file), path, or PDF bytes
+            
+        Returns:
+            Markdown-formatted content
+        """
+        logger.info("Starting async PDF extraction with Gemini", extra={
+            "service": "document",
+            "parser": "gemini",
+            "operation": "extract"
+        })
+        
+        if not settings.GEMINI_API_KEY:
+            logger.error("Gemini API key not configured", extra={
+                "service": "document",
+                "parser": "gemini",
+                "operation": "extract",
+                "error": "api_key_missing"
+            })
+            raise ValueError("Gemini API key not configured")
+        
+        try:
+            pdf_bytes = await asyncio.to_thread(_load_pdf_bytes, file_obj)
+            markdown = await asyncio.to_thread(self._try_structured_markdown, pdf_bytes)
+            if markdown is not None:
+                return markdown
+            
+            raw_text = await self.extract_with_pypdf_async(pdf_bytes)
+            
+            markdown = await self._generate_with_gemini_cached(
+                _llm_cache_key("gemini-md", MARKDOWN_PROMPT_VERSION, raw_text),
+                _markdown_prompt(raw_text)
+            )
+            logger.info("PDF extraction completed with Gemini", extra={
+                "service": "document",
+                "parser": "gemini",
+                "operation": "extract",
+                "raw_text_length": len(raw_text),
+                "markdown_length": len(markdown)
+            })
+            return markdown
+        except Exception as e:
+            logger.error("PDF extraction failed with Gemini", extra={
+                "service": "document",
+                "parser": "gemini",
+                "operation": "extract",
+                "error_type": type(e).__name__,
+                "error_message": str(e)
+            }, exc_info=True)
+            raise
+    
+    async def extract_with_mistral_async(self, file_obj) -> str:
+        """
+        Extract text from PDF using Mistral's async client.
+        Falls back to the plain extracted text on API errors and returns a stubbed
+        string when MISTRAL_API_KEY is not set, like extract_with_mistral.
+        
+        Args:
+            file_obj: File-like object (BytesIO or file), path, or PDF bytes
+        Returns:
+            Extracted text (real OCR output, or a FallbackText with the raw
+            text or stub)
+        """
+        logger.info("Starting async PDF extraction with Mistral", extra={
+            "service": "document",
+            "parser": "mistral",
+            "operation": "extract"
+        })
+        
+        if not settings.MISTRAL_API_KEY:
+            logger.warning("Mistral API key not set, using stubbed output", extra={
+                "service": "document",
+                "parser": "mistral",
+                "operation": "extract",
+                "mode": "stubbed"
+            })
+            return FallbackText("[Stubbed Mistral OCR output for testing]")
+        
+        # Extracted once; it doubles as the fallback result
+        raw_text = await self.extract_with_pypdf_async(file_obj)
+        
+        try:
+            async with self.llm_semaphore:
+                chat_response = await self.mistral_async_client.chat(
+                    model="mistral-tiny",  # Using tiny model for OCR enhancement
+                    messages=_ocr_messages(raw_text)
+                )
+            
+            enhanced_text = chat_response.choices[0].message.content
+            logger.info("PDF extraction completed with Mistral", extra={
+                "service": "document",
+                "parser": "mistral",
+                "operation": "extract",
+                "raw_text_length": len(raw_text),
+                "enhanced_text_length": len(enhanced_text)
+            })
+            return enhanced_text
+            
+        except Exception as e:
+            logger.error("PDF extraction failed with Mistral", extra={
+                "service": "document",
+                "parser": "mistral",
+                "operation": "extract",
+                "error_type": type(e).__name__,
+                "error_message": str(e)
+            }, exc_info=True)
+            logger.info("Falling back to PyPDF2 extraction", extra={
+                "service": "document",
+                "parser": "mistral",
+                "operation": "fallback",
+                "fallback_parser": "pypdf"
+            })
+            return FallbackText(raw_text)
+    
+    async def _summarize_chunk_async(self, text: str) -> str:
+        """Summarize a piece of text with a single (cached) async Gemini call."""
+        return await self._generate_with_gemini_cached(
+            _llm_cache_key("summ", SUMMARY_PROMPT_VERSION, text),
+            _summary_prompt(text)
+        )
+    
+    async def summarize_with_gemini_async(self, content: str) -> str:
+        """
+        Summarize content using Google Gemini's async API.
+        
+        Long content is summarized map-reduce style like summarize_with_gemini,
+        with the chunk calls running concurrently under llm_semaphore.
+        
+        Args:
+            content: Content to summarize
             
-            prompt = f"""
-            Provide a concise summary of the following document content. 
-            Focus on the key points and main ideas:
+        Returns:
+            Summary text
+        """
+        logger.info("Starting async content summarization", extra={
+            "service": "document",
+            "operation": "summarize",
+            "content_length": len(content)
+        })
+        
+        if not settings.GEMINI_API_KEY:
+            logger.error("Gemini API key not configured", extra={
+                "service": "document",
+                "operation": "summarize",
+                "error": "api_key_missing"
+            })
+            raise ValueError("Gemini API key not configured")
+        
+        try:
+            content = _trim_for_summary(content)
+            vec = None
+            if settings.SEMANTIC_CACHE_ENABLED:
+                cached, vec = await self._semantic_cache_lookup(content)
+                if cached is not None:
+                    return cached
             
-            {content}
-            """
+            if len(content) > settings.SUMMARY_CHUNK_CHARS:
+                # Map: summarize the chunks concurrently; reduce: summarize their summaries
+                chunks = _chunk_text(content, settings.SUMMARY_CHUNK_CHARS, settings.SUMMARY_CHUNK_OVERLAP)
+                partials = await asyncio.gather(*(self._summarize_chunk_async(chunk) for chunk in chunks))
+                summary = await self._summarize_chunk_async("\n\n".join(partials))
+            else:
+                summary = await self._summarize_chunk_async(content)
             
-            response = model.generate_content(prompt)
+            if vec is not None:
+                try:
+                    await redis_service.add_summary_vector(vec, summary)
+                except Exception:
+                    # Already logged by RedisService; the summary is still usable
+                    pass
             logger.info("Content summarization completed", extra={
                 "service": "document",
                 "operation": "summarize",
                 "input_length": len(content),
-                "summary_length": len(response.text)
+                "summary_length": len(summary)
             })
-            return response.text
+            return summary
         except Exception as e:
             logger.error("Content summarization failed", extra={
                 "service": "document",
@@ -274,23 +889,115 @@ class DocumentService:
             }, exc_info=True)
             raise
     
-    def get_parser_function(self, parser_type: ParserType):
+    async def summarize_batch_async(self, contents: List[Tuple[str, str]]) -> Dict[str, str]:
+        """
+        Summarize several documents, sharing one Gemini call between them.
+        
+        Documents already in the exact-hash cache are answered from it. The
+        remaining ones of up to settings.SUMMARY_BATCH_MAX_CHARS characters
+        are sent together in a single JSON-mode request; longer documents,
+        documents missing from the JSON reply, and the whole batch if the
+        reply cannot be parsed are summarized one by one with
+        summarize_with_gemini_async.
+        
+        Args:
+            contents: List of (document id, content) pairs
+            
+        Returns:
+            Mapping of document id to summary; documents whose summary
+            failed are left out
+        """
+        logger.info("Starting batch content summarization", extra={
+            "service": "document",
+            "operation": "summarize_batch",
+            "batch_size": len(contents)
+        })
+        
+        if not settings.GEMINI_API_KEY:
+            logger.error("Gemini API key not configured", extra={
+                "service": "document",
+                "operation": "summarize_batch",
+                "error": "api_key_missing"
+            })
+            raise ValueError("Gemini API key not configured")
+        
+        summaries: Dict[str, str] = {}
+        batchable = [
+            (doc_id, content) for doc_id, content in contents
+            if len(content) <= settings.SUMMARY_BATCH_MAX_CHARS
+        ]
+        cache_keys = {
+            doc_id: _llm_cache_key("summ", SUMMARY_PROMPT_VERSION, content)
+            for doc_id, content in batchable
+        }
+        cached = await asyncio.gather(
+            *(redis_service.get_llm_cache(cache_keys[doc_id]) for doc_id, _ in batchable),
+            return_exceptions=True
+        )
+        batch = []
+        for (doc_id, content), summary in zip(batchable, cached):
+            if isinstance(summary, str):
+                summaries[doc_id] = summary
+            else:
+                batch.append((doc_id, content))
+        
+        if len(batch) > 1:
+            try:
+                async with self.llm_semaphore:
+                    response = await self.gemini_model.generate_content_async(
+                        _batch_summary_prompt(batch),
+                        generation_config={"response_mime_type": "application/json"}
+                    )
+                results = {str(item["id"]): item["summary"] for item in orjson.loads(response.text)}
+                for doc_id, _ in batch:
+                    if isinstance(results.get(doc_id), str):
+                        summaries[doc_id] = results[doc_id]
+                        try:
+                            await redis_service.set_llm_cache(cache_keys[doc_id], results[doc_id])
+                        except Exception:
+                            # Already logged by RedisService; the summary is still usable
+                            pass
+            except Exception as e:
+                logger.warning("Batch summarization failed, falling back to per-document calls", extra={
+                    "service": "document",
+                    "operation": "summarize_batch",
+                    "batch_size": len(batch),
+                    "error_type": type(e).__name__,
+                    "error_message": str(e)
+                })
+        
+        remaining = [(doc_id, content) for doc_id, content in contents if doc_id not in summaries]
+        results = await asyncio.gather(
+            *(self.summarize_with_gemini_async(content) for _, content in remaining),
+            return_exceptions=True
+        )
+        for (doc_id, _), summary in zip(remaining, results):
+            # Failures were logged by summarize_with_gemini_async
+            if isinstance(summary, str):
+                summaries[doc_id] = summary
+        
+        logger.info("Batch content summarization completed", extra={
+            "service": "document",
+            "operation": "summarize_batch",
+            "batch_size": len(contents),
+            "batched_documents": len(batch) if len(batch) > 1 else 0,
+            "individual_calls": len(remaining),
+            "failed": len(contents) - len(summaries)
+        })
+        return summaries
+    
+    def get_parser_function(self, parser_type: ParserType, use_async: bool = False):
         """
         Get the appropriate parser function based on the parser type.
         
         Args:
             parser_type: Type of parser to use
+            use_async: Return the coroutine variant of the parser
             
         Returns:
             Parser function
         """
-        parser_map = {
-            ParserType.PYPDF: self.extract_with_pypdf,
-            ParserType.GEMINI: self.extract_with_gemini,
-            ParserType.MISTRAL: self.extract_with_mistral,
-        }
-        
-        parser_func = parser_map.get(parser_type)
+        parser_func = self._parser_funcs[use_async].get(parser_type)
         if not parser_func:
             logger.error("Unknown parser type", extra={
                 "service": "document",
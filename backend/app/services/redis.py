@@ -1,8 +1,16 @@
 """Redis service for interacting with Redis database."""
 
-import json
-import redis
-from typing import Dict, Any, Optional
+import asyncio
+import os
+import time
+import uuid
+import orjson
+import redis.asyncio as redis
+import zstandard
+from redis.commands.search.field import TextField, VectorField
+from redis.commands.search.indexDefinition import IndexDefinition, IndexType
+from redis.commands.search.query import Query
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union
 
 from ..core.config import get_settings
 from ..core.logger import get_logger
@@ -10,6 +18,113 @@ from ..core.logger import get_logger
 logger = get_logger(__name__)
 settings = get_settings()
 
+# Known job statuses; each one has a job_index:<status> set of job IDs
+JOB_STATUSES = ("pending", "processing", "done", "error")
+
+# Statuses after which a job is no longer updated; its hash then expires after settings.JOB_TTL
+TERMINAL_JOB_STATUSES = frozenset(("done", "error"))
+
+# Job hash fields returned to API clients
+JOB_FIELDS = ("status", "markdown", "summary")
+
+# Stream entries carry the whole job as one JSON document in this field
+STREAM_PAYLOAD_FIELD = "payload"
+_STREAM_PAYLOAD_KEY = STREAM_PAYLOAD_FIELD.encode()
+
+
+# RediSearch vector index over summaries:<uuid> hashes used by the semantic cache
+SUMMARY_INDEX = "idx:summaries"
+SUMMARY_PREFIX = "summaries:"
+
+
+def job_index_key(status: str) -> str:
+    """Return the key of the secondary index set for a job status."""
+    return f"job_index:{status}"
+
+
+# markdown/summary values at least this large are stored zstd-compressed
+COMPRESS_MIN_BYTES = 1024
+# Every zstd frame starts with this magic number, which is never valid UTF-8
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_compressor = zstandard.ZstdCompressor(level=3)
+_decompressor = zstandard.ZstdDecompressor()
+
+
+def encode_job_blob(value: str) -> bytes:
+    """Encode a markdown/summary value, compressing it when large enough."""
+    data = value.encode('utf-8')
+    if settings.COMPRESS_JOB_BLOBS and len(data) >= COMPRESS_MIN_BYTES:
+        return _compressor.compress(data)
+    return data
+
+
+def decode_job_value(value: bytes) -> str:
+    """Decode a job hash value written by encode_job_blob or stored as plain text."""
+    if value.startswith(ZSTD_MAGIC):
+        value = _decompressor.decompress(value)
+    return value.decode('utf-8')
+
+
+def encode_stream_entry(data: Dict[str, Any]) -> Dict[str, bytes]:
+    """Serialize a stream entry as a single JSON payload field."""
+    return {STREAM_PAYLOAD_FIELD: orjson.dumps(data)}
+
+
+def decode_stream_entry(data: Dict[bytes, bytes]) -> Dict[str, Any]:
+    """Decode a stream entry written by encode_stream_entry."""
+    payload = data.get(_STREAM_PAYLOAD_KEY)
+    if payload is not None:
+        return orjson.loads(payload)
+    # Entries enqueued before the single payload field carried one JSON value per field
+    return {k.decode('utf-8'): orjson.loads(v) for k, v in data.items()}
+
+
+def pdf_file_path(job_id: str) -> str:
+    """Path of the PDF for job_id under settings.PDF_STORE_DIR."""
+    return os.path.join(settings.PDF_STORE_DIR, f"{job_id}.pdf")
+
+
+def _write_pdf_file(job_id: str, data: Union[bytes, memoryview], mode: str) -> int:
+    """Write (mode "wb") or append (mode "ab") PDF bytes to disk and return the file size."""
+    os.makedirs(settings.PDF_STORE_DIR, exist_ok=True)
+    with open(pdf_file_path(job_id), mode) as f:
+        f.write(data)
+        return f.tell()
+
+
+def _read_pdf_file(job_id: str) -> bytes:
+    """Read the PDF stored on disk for job_id."""
+    with open(pdf_file_path(job_id), "rb") as f:
+        return f.read()
+
+
+def _delete_pdf_file(job_id: str) -> None:
+    """Delete the PDF stored on disk for job_id, if any."""
+    try:
+        os.remove(pdf_file_path(job_id))
+    except FileNotFoundError:
+        pass
+
+
+def _delete_expired_pdf_files(max_age_s: int) -> int:
+    """Delete the PDFs under settings.PDF_STORE_DIR last written over max_age_s ago and return their number."""
+    cutoff = time.time() - max_age_s
+    deleted = 0
+    try:
+        entries = os.scandir(settings.PDF_STORE_DIR)
+    except FileNotFoundError:
+        return 0
+    with entries:
+        for entry in entries:
+            try:
+                if entry.name.endswith(".pdf") and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    deleted += 1
+            except FileNotFoundError:
+                # Removed concurrently, e.g. by another worker's sweep
+                pass
+    return deleted
+
 
 class RedisService:
     """Service for interacting with Redis."""
@@ -19,6 +134,7 @@ class RedisService:
         self.redis_host = host
         self.redis_port = port
         self._connection = None
+        self._summary_index_ready = False
         logger.info("Redis service initialized", extra={
             "service": "redis",
             "host": host,
@@ -27,114 +143,424 @@ class RedisService:
     
     @property
     def connection(self) -> redis.Redis:
-        """Get or create Redis connection."""
+        """
+        Get or create the shared async Redis client.
+
+        The client is backed by a connection pool, so concurrent handlers
+        awaiting Redis commands do not block the event loop or each other.
+        The pool holds at most settings.REDIS_POOL_SIZE connections and makes
+        callers wait for a free one instead of failing; idle connections are
+        health-checked before reuse. Connections are opened lazily on first use.
+        """
         if self._connection is None:
-            try:
-                self._connection = redis.Redis(
-                    host=self.redis_host,
-                    port=self.redis_port,
-                    decode_responses=False
-                )
-                # Test connection
-                self._connection.ping()
-                logger.info("Redis connection established", extra={
-                    "service": "redis",
-                    "host": self.redis_host,
-                    "port": self.redis_port,
-                    "status": "connected"
-                })
-            except redis.ConnectionError as e:
-                logger.error("Redis connection failed", extra={
-                    "service": "redis",
-                    "host": self.redis_host,
-                    "port": self.redis_port,
-                    "error_type": type(e).__name__,
-                    "error_message": str(e)
-                }, exc_info=True)
-                raise
+            pool = redis.BlockingConnectionPool(
+                host=self.redis_host,
+                port=self.redis_port,
+                max_connections=settings.REDIS_POOL_SIZE,
+                health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+                socket_keepalive=True,
+                decode_responses=False
+            )
+            self._connection = redis.Redis.from_pool(pool)
+            logger.info("Redis connection pool created", extra={
+                "service": "redis",
+                "host": self.redis_host,
+                "port": self.redis_port,
+                "max_connections": settings.REDIS_POOL_SIZE
+            })
         return self._connection
     
-    def add_to_stream(self, stream_name: str, data: Dict[str, Any]) -> str:
+    async def enqueue_jobs(self, stream_name: str, jobs: List[Dict[str, Any]]) -> List[str]:
         """
-        Add data to a Redis stream.
-        
+        Mark a batch of jobs as pending and add them to a Redis stream.
+
+        All writes go through a single non-transactional pipeline, so a batch
+        of N uploads costs one round-trip instead of 2N. Each job is written
+        under its own job_id, which makes replaying the batch harmless. The
+        stream is trimmed to roughly settings.STREAM_MAXLEN entries so that
+        blocking consumers read from a bounded stream.
+
         Args:
             stream_name: Name of the stream
-            data: Dictionary with job details
-            
+            jobs: List of dictionaries with job details (must include job_id)
+
         Returns:
-            ID of the stream entry
+            IDs of the stream entries, in the same order as jobs
         """
         try:
-            serialized_data = {k: json.dumps(v) for k, v in data.items()}
-            entry_id = self.connection.xadd(stream_name, serialized_data)
-            logger.info("Added entry to Redis stream", extra={
+            async with self.connection.pipeline(transaction=False) as pipe:
+                for job in jobs:
+                    pipe.hset(
+                        f"job:{job['job_id']}",
+                        mapping={
+                            "status": "pending",
+                            "markdown": "",
+                            "summary": "",
+                            "markdown_length": 0,
+                            "summary_length": 0
+                        }
+                    )
+                    pipe.sadd(job_index_key("pending"), job["job_id"])
+                    pipe.xadd(
+                        stream_name,
+                        encode_stream_entry(job),
+                        maxlen=settings.STREAM_MAXLEN,
+                        approximate=True
+                    )
+                results = await pipe.execute()
+            # Every job contributes HSET, SADD and XADD replies, in that order
+            entry_ids = results[2::3]
+            logger.info("Enqueued jobs in Redis stream", extra={
                 "service": "redis",
-                "operation": "add_to_stream",
+                "operation": "enqueue_jobs",
                 "stream": stream_name,
-                "job_id": data.get("job_id", "unknown"),
-                "entry_id": entry_id.decode('utf-8') if isinstance(entry_id, bytes) else entry_id
+                "job_count": len(jobs)
             })
-            return entry_id
+            return entry_ids
         except Exception as e:
-            logger.error("Failed to add entry to Redis stream", extra={
+            logger.error("Failed to enqueue jobs in Redis stream", extra={
                 "service": "redis",
-                "operation": "add_to_stream",
+                "operation": "enqueue_jobs",
                 "stream": stream_name,
+                "job_count": len(jobs),
                 "error_type": type(e).__name__,
                 "error_message": str(e)
             }, exc_info=True)
             raise
-    
-    def set_job_status(self, job_id: str, status: str, markdown: str = "", summary: str = "") -> None:
+
+    async def ensure_group(self, stream_name: str, group_name: str, start_id: str = "0") -> bool:
         """
-        Update job status in Redis.
+        Create a consumer group (and the stream) unless it already exists.
+        
+        Args:
+            stream_name: Name of the stream
+            group_name: Name of the consumer group
+            start_id: First entry the group delivers ("0" includes entries added before the group)
+            
+        Returns:
+            True if the group was created, False if it already existed
+        """
+        try:
+            await self.connection.xgroup_create(stream_name, group_name, id=start_id, mkstream=True)
+            logger.info("Created consumer group", extra={
+                "service": "redis",
+                "operation": "ensure_group",
+                "stream": stream_name,
+                "consumer_group": group_name
+            })
+            return True
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                logger.error("Failed to create consumer group", extra={
+                    "service": "redis",
+                    "operation": "ensure_group",
+                    "stream": stream_name,
+                    "consumer_group": group_name,
+                    "error_type": type(e).__name__,
+                    "error_message": str(e)
+                })
+                raise
+            logger.info("Consumer group already exists", extra={
+                "service": "redis",
+                "operation": "ensure_group",
+                "stream": stream_name,
+                "consumer_group": group_name
+            })
+            return False
+
+    async def read_batch(
+        self,
+        stream_name: str,
+        group_name: str,
+        consumer: str,
+        count: int,
+        block_ms: int
+    ) -> List[Tuple[bytes, Dict[bytes, bytes]]]:
+        """
+        Read up to count new entries for a consumer of a group.
+        
+        Args:
+            stream_name: Name of the stream
+            group_name: Name of the consumer group
+            consumer: Name of this consumer
+            count: Maximum number of entries to return
+            block_ms: Milliseconds to wait for new entries
+            
+        Returns:
+            List of (entry ID, raw fields) pairs, empty if none arrived in time
+        """
+        entries = await self.connection.xreadgroup(
+            group_name,
+            consumer,
+            {stream_name: ">"},
+            count=count,
+            block=block_ms
+        )
+        return [message for _, messages in entries or () for message in messages]
+
+    async def autoclaim(
+        self,
+        stream_name: str,
+        group_name: str,
+        consumer: str,
+        min_idle_ms: int,
+        count: int,
+        start_id: str = "0-0"
+    ) -> Tuple[str, List[Tuple[bytes, Dict[bytes, bytes]]]]:
+        """
+        Take over entries another consumer read but has not acknowledged for min_idle_ms.
+        
+        Entries of a crashed worker stay pending forever otherwise; claiming
+        them hands them to this consumer for processing. Each call scans at
+        most count entries of the pending list, starting at start_id; pass the
+        returned cursor back in to continue the scan until it wraps to "0-0".
+        
+        Args:
+            stream_name: Name of the stream
+            group_name: Name of the consumer group
+            consumer: Name of this consumer
+            min_idle_ms: Minimum idle time of the entries to claim
+            count: Maximum number of entries to claim
+            start_id: Pending list cursor to start scanning from
+            
+        Returns:
+            Cursor for the next call ("0-0" once the whole pending list was
+            scanned) and the list of (entry ID, raw fields) pairs now owned by consumer
+        """
+        result = await self.connection.xautoclaim(
+            stream_name,
+            group_name,
+            consumer,
+            min_idle_time=min_idle_ms,
+            count=count,
+            start_id=start_id
+        )
+        cursor = result[0].decode('utf-8') if isinstance(result[0], bytes) else result[0]
+        # Entries deleted from the stream come back without an ID on Redis 6.2
+        messages = [message for message in result[1] if message[0] is not None]
+        if messages:
+            logger.info("Claimed stale stream entries", extra={
+                "service": "redis",
+                "operation": "autoclaim",
+                "stream": stream_name,
+                "consumer": consumer,
+                "entry_count": len(messages)
+            })
+        return cursor, messages
+
+    async def trim_acknowledged(self, stream_name: str) -> int:
+        """
+        Drop stream entries that every consumer group has read and acknowledged.
+        
+        The cut-off of each group is its oldest pending entry, or its
+        last-delivered ID when nothing is pending; entries older than the
+        lowest cut-off are removed with XTRIM MINID. Pending entries stay, so
+        they can still be claimed.
+        
+        Args:
+            stream_name: Name of the stream
+            
+        Returns:
+            Number of entries removed
+        """
+        groups = await self.connection.xinfo_groups(stream_name)
+        if not groups:
+            return 0
+        async with self.connection.pipeline(transaction=False) as pipe:
+            for group in groups:
+                pipe.xpending(stream_name, group["name"])
+            pending = await pipe.execute()
+        
+        cutoffs = [
+            group_pending["min"] if group_pending["pending"] else group["last-delivered-id"]
+            for group, group_pending in zip(groups, pending)
+        ]
+        min_id = min(cutoffs, key=lambda entry_id: tuple(int(part) for part in entry_id.split(b"-")))
+        trimmed = await self.connection.xtrim(stream_name, minid=min_id, approximate=True)
+        if trimmed:
+            logger.info("Trimmed acknowledged stream entries", extra={
+                "service": "redis",
+                "operation": "trim_acknowledged",
+                "stream": stream_name,
+                "entry_count": trimmed
+            })
+        return trimmed
+
+    @staticmethod
+    def _queue_job_fields(pipe, job_id: str, fields: Dict[str, Any]) -> None:
+        """
+        Queue the writes updating a job hash on a pipeline.
+        
+        markdown/summary are accompanied by their (uncompressed) lengths and
+        compressed when large, and a status change moves the job between
+        the status index sets. Reaching a terminal status sets the hash to
+        expire after settings.JOB_TTL, so earlier transitions never reset it.
+        """
+        mapping = dict(fields)
+        for name in ("markdown", "summary"):
+            if name in mapping:
+                mapping[f"{name}_length"] = len(mapping[name])
+                mapping[name] = encode_job_blob(mapping[name])
+        pipe.hset(f"job:{job_id}", mapping=mapping)
+        status = fields.get("status")
+        if status is not None:
+            for other_status in JOB_STATUSES:
+                if other_status != status:
+                    pipe.srem(job_index_key(other_status), job_id)
+            pipe.sadd(job_index_key(status), job_id)
+            if status in TERMINAL_JOB_STATUSES and settings.JOB_TTL > 0:
+                pipe.expire(f"job:{job_id}", settings.JOB_TTL)
+
+    async def set_job_fields(self, job_id: str, **fields: Any) -> None:
+        """
+        Update only the given fields of a job hash.
         
         Args:
             job_id: Unique job identifier
-            status: Job status (pending, processing, done, error)
-            markdown: Extracted markdown content
-            summary: Generated summary
+            **fields: Fields to write (status, markdown, summary, ...)
         """
+        if not fields:
+            return
         try:
-            self.connection.hset(
-                f"job:{job_id}",
-                mapping={
-                    "status": status,
-                    "markdown": markdown,
-                    "summary": summary
-                }
-            )
-            logger.info("Updated job status in Redis", extra={
+            # Update the hash and the status index sets atomically
+            async with self.connection.pipeline(transaction=True) as pipe:
+                self._queue_job_fields(pipe, job_id, fields)
+                await pipe.execute()
+            logger.info("Updated job fields in Redis", extra={
                 "service": "redis",
-                "operation": "set_job_status",
+                "operation": "set_job_fields",
                 "job_id": job_id,
-                "status": status,
-                "markdown_length": len(markdown),
-                "summary_length": len(summary)
+                "status": fields.get("status"),
+                "fields": list(fields)
             })
         except Exception as e:
-            logger.error("Failed to update job status in Redis", extra={
+            logger.error("Failed to update job fields in Redis", extra={
                 "service": "redis",
-                "operation": "set_job_status",
+                "operation": "set_job_fields",
                 "job_id": job_id,
                 "error_type": type(e).__name__,
                 "error_message": str(e)
             }, exc_info=True)
             raise
+
+    async def set_job_statuses_bulk(self, updates: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """
+        Update several job hashes in a single round-trip.
+        
+        Args:
+            updates: List of (job_id, fields) pairs, fields as for set_job_fields
+        """
+        updates = [(job_id, fields) for job_id, fields in updates if fields]
+        if not updates:
+            return
+        try:
+            async with self.connection.pipeline(transaction=True) as pipe:
+                for job_id, fields in updates:
+                    self._queue_job_fields(pipe, job_id, fields)
+                await pipe.execute()
+            logger.info("Updated job fields in Redis", extra={
+                "service": "redis",
+                "operation": "set_job_statuses_bulk",
+                "job_count": len(updates)
+            })
+        except Exception as e:
+            logger.error("Failed to update job fields in Redis", extra={
+                "service": "redis",
+                "operation": "set_job_statuses_bulk",
+                "job_count": len(updates),
+                "error_type": type(e).__name__,
+                "error_message": str(e)
+            }, exc_info=True)
+            raise
+
+    async def finalize_jobs(self, updates: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """
+        Store the final fields of several jobs and drop the PDFs of finished ones.
+        
+        The job updates and the deletion of the PDFs of jobs reaching a
+        terminal status (done or error) go out in one transaction, i.e. a
+        single round-trip. PDFs stored under settings.PDF_STORE_DIR are
+        removed from disk afterwards.
+        
+        Args:
+            updates: List of (job_id, fields) pairs, fields as for set_job_fields
+        """
+        updates = [(job_id, fields) for job_id, fields in updates if fields]
+        if not updates:
+            return
+        finished_ids = [job_id for job_id, fields in updates if fields.get("status") in TERMINAL_JOB_STATUSES]
+        try:
+            async with self.connection.pipeline(transaction=True) as pipe:
+                for job_id, fields in updates:
+                    self._queue_job_fields(pipe, job_id, fields)
+                if not settings.PDF_STORE_DIR:
+                    for job_id in finished_ids:
+                        pipe.delete(f"pdf:{job_id}", f"pdf:{job_id}:chunks")
+                await pipe.execute()
+            logger.info("Finalized jobs in Redis", extra={
+                "service": "redis",
+                "operation": "finalize_jobs",
+                "job_count": len(updates),
+                "finished_count": len(finished_ids)
+            })
+        except Exception as e:
+            logger.error("Failed to finalize jobs in Redis", extra={
+                "service": "redis",
+                "operation": "finalize_jobs",
+                "job_count": len(updates),
+                "error_type": type(e).__name__,
+                "error_message": str(e)
+            }, exc_info=True)
+            raise
+        
+        if settings.PDF_STORE_DIR:
+            for job_id in finished_ids:
+                await self.delete_pdf(job_id)
+
+    async def set_job_status(self, job_id: str, status: str, markdown: str = "", summary: str = "") -> None:
+        """
+        Update job status in Redis.
+        
+        Empty markdown/summary are not written, so status bumps such as
+        pending -> processing do not resend or clear the content fields.
+        
+        Args:
+            job_id: Unique job identifier
+            status: Job status (pending, processing, done, error)
+            markdown: Extracted markdown content
+            summary: Generated summary
+        """
+        fields = {"status": status}
+        if markdown:
+            fields["markdown"] = markdown
+        if summary:
+            fields["summary"] = summary
+        await self.set_job_fields(job_id, **fields)
     
-    def get_job_status(self, job_id: str) -> Optional[Dict[str, str]]:
+    async def get_job_status(
+        self,
+        job_id: str,
+        fields: Optional[Sequence[str]] = JOB_FIELDS
+    ) -> Optional[Dict[str, str]]:
         """
         Get job status from Redis.
         
+        Only the requested fields are read with HMGET, so bookkeeping fields
+        are never transferred; pass fields=None to read the whole hash.
+        
         Args:
             job_id: Unique job identifier
+            fields: Job hash fields to read (status, markdown and summary by default)
             
         Returns:
             Dictionary with job status data or None if not found
         """
         try:
-            job_data = self.connection.hgetall(f"job:{job_id}")
+            if fields is None:
+                job_data = await self.connection.hgetall(f"job:{job_id}")
+            else:
+                values = await self.connection.hmget(f"job:{job_id}", fields)
+                job_data = {field: value for field, value in zip(fields, values) if value is not None}
             
             if not job_data:
                 logger.warning("Job not found in Redis", extra={
@@ -144,8 +570,11 @@ class RedisService:
                 })
                 return None
             
-            # Convert bytes to strings
-            result = {k.decode('utf-8'): v.decode('utf-8') for k, v in job_data.items()}
+            # Convert bytes to strings, decompressing large markdown/summary values
+            result = {
+                (k.decode('utf-8') if isinstance(k, bytes) else k): decode_job_value(v)
+                for k, v in job_data.items()
+            }
             logger.debug("Retrieved job status from Redis", extra={
                 "service": "redis",
                 "operation": "get_job_status",
@@ -163,12 +592,114 @@ class RedisService:
             }, exc_info=True)
             raise
 
-    def set_pdf(self, job_id: str, pdf_bytes: bytes) -> None:
+    async def get_statuses(self, job_ids: List[str]) -> List[Optional[str]]:
         """
-        Store PDF bytes in Redis under key pdf:{job_id}.
+        Get the statuses of several jobs in one round-trip, without transferring their content.
+        
+        Args:
+            job_ids: Unique job identifiers
+            
+        Returns:
+            Status of each job (None if not found), in the same order as job_ids
         """
         try:
-            self.connection.set(f"pdf:{job_id}", pdf_bytes)
+            async with self.connection.pipeline(transaction=False) as pipe:
+                for job_id in job_ids:
+                    pipe.hget(f"job:{job_id}", "status")
+                statuses = await pipe.execute()
+            return [status.decode('utf-8') if status is not None else None for status in statuses]
+        except Exception as e:
+            logger.error("Failed to get job statuses from Redis", extra={
+                "service": "redis",
+                "operation": "get_statuses",
+                "job_count": len(job_ids),
+                "error_type": type(e).__name__,
+                "error_message": str(e)
+            }, exc_info=True)
+            raise
+
+    async def get_jobs_by_status(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        List jobs grouped by status using the job_index:<status> sets.
+
+        Reads the index sets in one pipeline and the stored content lengths
+        in a second one, so neither the keyspace nor the markdown/summary
+        bodies are ever scanned. IDs of jobs whose hash has expired are
+        dropped from the index sets.
+
+        Returns:
+            Mapping of status to a list of job_id/markdown_length/summary_length dicts
+        """
+        try:
+            async with self.connection.pipeline(transaction=False) as pipe:
+                for status in JOB_STATUSES:
+                    pipe.smembers(job_index_key(status))
+                index_members = await pipe.execute()
+
+            async with self.connection.pipeline(transaction=False) as pipe:
+                for job_ids in index_members:
+                    for job_id in job_ids:
+                        pipe.hmget(f"job:{job_id.decode('utf-8')}", "status", "markdown_length", "summary_length")
+                lengths = iter(await pipe.execute())
+
+            jobs_by_status = {}
+            expired = []
+            for status, job_ids in zip(JOB_STATUSES, index_members):
+                jobs_by_status[status] = []
+                for job_id in job_ids:
+                    stored_status, markdown_length, summary_length = next(lengths)
+                    if stored_status is None:
+                        expired.append((status, job_id))
+                        continue
+                    jobs_by_status[status].append({
+                        "job_id": job_id.decode('utf-8'),
+                        "markdown_length": int(markdown_length or 0),
+                        "summary_length": int(summary_length or 0)
+                    })
+            
+            if expired:
+                async with self.connection.pipeline(transaction=False) as pipe:
+                    for status, job_id in expired:
+                        pipe.srem(job_index_key(status), job_id)
+                    await pipe.execute()
+            return jobs_by_status
+        except Exception as e:
+            logger.error("Failed to list jobs by status from Redis", extra={
+                "service": "redis",
+                "operation": "get_jobs_by_status",
+                "error_type": type(e).__name__,
+                "error_message": str(e)
+            }, exc_info=True)
+            raise
+
+    async def set_pdf(self, job_id: str, pdf_bytes: bytes) -> None:
+        """
+        Store PDF bytes in Redis.
+        
+        PDFs smaller than settings.PDF_CHUNK_SIZE are stored as a single
+        value under pdf:{job_id}. Larger ones are split into a list of
+        PDF_CHUNK_SIZE segments under pdf:{job_id}:chunks, written with one
+        pipeline, so no single command holds the server for the whole file.
+        Both expire after settings.PDF_TTL seconds.
+        
+        When settings.PDF_STORE_DIR is set, the PDF is written to that shared
+        directory instead and never passes through Redis.
+        """
+        try:
+            if settings.PDF_STORE_DIR:
+                await asyncio.to_thread(_write_pdf_file, job_id, pdf_bytes, "wb")
+                return
+            chunk_size = settings.PDF_CHUNK_SIZE
+            async with self.connection.pipeline(transaction=False) as pipe:
+                pipe.delete(f"pdf:{job_id}", f"pdf:{job_id}:chunks")
+                if len(pdf_bytes) < chunk_size:
+                    pipe.set(f"pdf:{job_id}", pdf_bytes, ex=settings.PDF_TTL)
+                else:
+                    view = memoryview(pdf_bytes)
+                    for offset in range(0, len(view), chunk_size):
+                        pipe.rpush(f"pdf:{job_id}:chunks", view[offset:offset + chunk_size])
+                    pipe.expire(f"pdf:{job_id}:chunks", settings.PDF_TTL)
+                await pipe.execute()
             logger.info("Stored PDF in Redis", extra={
                 "service": "redis",
                 "operation": "set_pdf",
@@ -185,12 +716,94 @@ class RedisService:
             }, exc_info=True)
             raise
 
-    def get_pdf(self, job_id: str) -> bytes:
+    async def append_pdf(self, job_id: str, chunk: Union[bytes, memoryview]) -> int:
+        """
+        Append a chunk of PDF bytes to the list stored under pdf:{job_id}:chunks.
+
+        Lets callers stream an upload into Redis without holding the whole
+        file in memory; the list is created on the first append and its
+        expiry is refreshed to settings.PDF_TTL. The chunk may be a
+        memoryview over a reused buffer, which is sent without copying and
+        can be overwritten once this call returns.
+
+        When settings.PDF_STORE_DIR is set, the chunk is appended to the
+        PDF's file in that directory instead.
+
+        Returns:
+            Number of chunks stored for the PDF after the append (the file
+            size in bytes for PDFs stored on disk)
+        """
+        try:
+            if settings.PDF_STORE_DIR:
+                return await asyncio.to_thread(_write_pdf_file, job_id, chunk, "ab")
+            async with self.connection.pipeline(transaction=False) as pipe:
+                pipe.rpush(f"pdf:{job_id}:chunks", chunk)
+                pipe.expire(f"pdf:{job_id}:chunks", settings.PDF_TTL)
+                chunk_count, _ = await pipe.execute()
+            return chunk_count
+        except Exception as e:
+            logger.error("Failed to append PDF chunk in Redis", extra={
+                "service": "redis",
+                "operation": "append_pdf",
+                "job_id": job_id,
+                "error_type": type(e).__name__,
+                "error_message": str(e)
+            }, exc_info=True)
+            raise
+
+    async def delete_pdf(self, job_id: str) -> None:
+        """
+        Delete the PDF bytes stored for job_id, whether single-valued, chunked or on disk.
+        """
+        if settings.PDF_STORE_DIR:
+            await asyncio.to_thread(_delete_pdf_file, job_id)
+            return
+        await self.connection.delete(f"pdf:{job_id}", f"pdf:{job_id}:chunks")
+        logger.debug("Deleted PDF from Redis", extra={
+            "service": "redis",
+            "operation": "delete_pdf",
+            "job_id": job_id
+        })
+
+    async def delete_expired_pdf_files(self) -> int:
+        """
+        Delete PDFs stored under settings.PDF_STORE_DIR for longer than settings.PDF_TTL.
+        
+        Files on disk do not expire like PDFs kept in Redis, so the worker
+        sweeps them periodically; this covers jobs whose PDF was never
+        finalized, e.g. uploads that failed before being enqueued.
+        
+        Returns:
+            Number of files deleted
+        """
+        if not settings.PDF_STORE_DIR:
+            return 0
+        deleted = await asyncio.to_thread(_delete_expired_pdf_files, settings.PDF_TTL)
+        if deleted:
+            logger.info("Deleted expired PDF files", extra={
+                "service": "redis",
+                "operation": "delete_expired_pdf_files",
+                "file_count": deleted
+            })
+        return deleted
+
+    async def get_pdf(self, job_id: str) -> bytes:
         """
         Retrieve PDF bytes from Redis by job_id.
+
+        Both storage layouts are read in one pipelined round-trip and
+        chunked PDFs are reassembled with a single join. PDFs stored under
+        settings.PDF_STORE_DIR are read from disk.
         """
         try:
-            pdf_bytes = self.connection.get(f"pdf:{job_id}")
+            if settings.PDF_STORE_DIR:
+                return await asyncio.to_thread(_read_pdf_file, job_id)
+            async with self.connection.pipeline(transaction=False) as pipe:
+                pipe.get(f"pdf:{job_id}")
+                pipe.lrange(f"pdf:{job_id}:chunks", 0, -1)
+                pdf_bytes, chunks = await pipe.execute()
+            if pdf_bytes is None and chunks:
+                pdf_bytes = b"".join(chunks)
             if pdf_bytes is None:
                 logger.error("PDF not found in Redis", extra={
                     "service": "redis",
@@ -204,7 +817,8 @@ class RedisService:
                 "service": "redis",
                 "operation": "get_pdf",
                 "job_id": job_id,
-                "pdf_size": len(pdf_bytes)
+                "pdf_size": len(pdf_bytes),
+                "chunk_count": len(chunks)
             })
             return pdf_bytes
         except Exception as e:
@@ -217,6 +831,141 @@ class RedisService:
             }, exc_info=True)
             raise
 
+    async def get_llm_cache(self, key: str) -> Optional[str]:
+        """
+        Get a cached LLM response stored under llmcache:{key}.
+        
+        Args:
+            key: Deterministic hash of the request (method, model, prompt version, input)
+            
+        Returns:
+            Cached response text or None on a miss
+        """
+        try:
+            value = await self.connection.get(f"llmcache:{key}")
+            logger.debug("LLM cache lookup", extra={
+                "service": "redis",
+                "operation": "get_llm_cache",
+                "cache_key": key,
+                "hit": value is not None
+            })
+            return value.decode('utf-8') if value is not None else None
+        except Exception as e:
+            logger.error("Failed to read LLM cache from Redis", extra={
+                "service": "redis",
+                "operation": "get_llm_cache",
+                "cache_key": key,
+                "error_type": type(e).__name__,
+                "error_message": str(e)
+            }, exc_info=True)
+            raise
+
+    async def set_llm_cache(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        """
+        Cache an LLM response under llmcache:{key}.
+        
+        Args:
+            key: Deterministic hash of the request (method, model, prompt version, input)
+            value: Response text
+            ttl: Expiry in seconds (defaults to settings.LLM_CACHE_TTL)
+        """
+        try:
+            await self.connection.setex(f"llmcache:{key}", ttl or settings.LLM_CACHE_TTL, value)
+        except Exception as e:
+            logger.error("Failed to write LLM cache to Redis", extra={
+                "service": "redis",
+                "operation": "set_llm_cache",
+                "cache_key": key,
+                "error_type": type(e).__name__,
+                "error_message": str(e)
+            }, exc_info=True)
+            raise
+
+    async def _ensure_summary_index(self, dim: int) -> None:
+        """Create the summary vector index on first use (no-op if it already exists)."""
+        if self._summary_index_ready:
+            return
+        try:
+            await self.connection.ft(SUMMARY_INDEX).create_index(
+                [
+                    TextField("summary", no_index=True),
+                    VectorField("vec", "HNSW", {
+                        "TYPE": "FLOAT32",
+                        "DIM": dim,
+                        "DISTANCE_METRIC": "COSINE"
+                    })
+                ],
+                definition=IndexDefinition(prefix=[SUMMARY_PREFIX], index_type=IndexType.HASH)
+            )
+            logger.info("Created summary vector index", extra={
+                "service": "redis",
+                "operation": "ensure_summary_index",
+                "index": SUMMARY_INDEX,
+                "dim": dim
+            })
+        except redis.ResponseError as e:
+            if "already exists" not in str(e).lower():
+                raise
+        self._summary_index_ready = True
+
+    async def find_similar_summary(self, vec: bytes, dim: int) -> Optional[Tuple[str, float]]:
+        """
+        Find the cached summary whose content embedding is nearest to vec.
+        
+        Args:
+            vec: FLOAT32 embedding of the content to summarize
+            dim: Embedding dimension
+            
+        Returns:
+            (summary, cosine similarity) of the nearest neighbour, or None if the index is empty
+        """
+        try:
+            await self._ensure_summary_index(dim)
+            query = (
+                Query("*=>[KNN 1 @vec $v AS distance]")
+                .sort_by("distance")
+                .return_fields("summary", "distance")
+                .dialect(2)
+            )
+            result = await self.connection.ft(SUMMARY_INDEX).search(query, query_params={"v": vec})
+            if not result.docs:
+                return None
+            doc = result.docs[0]
+            # COSINE distance is 1 - cosine similarity
+            return doc.summary, 1.0 - float(doc.distance)
+        except Exception as e:
+            logger.error("Failed to search summary vector index", extra={
+                "service": "redis",
+                "operation": "find_similar_summary",
+                "error_type": type(e).__name__,
+                "error_message": str(e)
+            }, exc_info=True)
+            raise
+
+    async def add_summary_vector(self, vec: bytes, summary: str, ttl: Optional[int] = None) -> None:
+        """
+        Store a summary with its content embedding under summaries:{uuid}.
+        
+        Args:
+            vec: FLOAT32 embedding of the summarized content
+            summary: Summary text
+            ttl: Expiry in seconds (defaults to settings.LLM_CACHE_TTL)
+        """
+        try:
+            key = f"{SUMMARY_PREFIX}{uuid.uuid4().hex}"
+            async with self.connection.pipeline(transaction=False) as pipe:
+                pipe.hset(key, mapping={"vec": vec, "summary": summary})
+                pipe.expire(key, ttl or settings.LLM_CACHE_TTL)
+                await pipe.execute()
+        except Exception as e:
+            logger.error("Failed to store summary vector in Redis", extra={
+                "service": "redis",
+                "operation": "add_summary_vector",
+                "error_type": type(e).__name__,
+                "error_message": str(e)
+            }, exc_info=True)
+            raise
+
 
 # Create a singleton instance
 redis_service = RedisService() 
\ No newline at end of file
@@ -11,4 +11,4 @@ fi
 
 # Run FastAPI application
 echo "Starting API server..."
-uvicorn app.main:app --host 0.0.0.0 --port 8000 "$@" 
\ No newline at end of file
+uvicorn app.main:app --host 0.0.0.0 --port 8000 --loop uvloop --http httptools "$@" 
\ No newline at end of file
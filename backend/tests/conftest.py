@@ -4,13 +4,16 @@ import os
 import pytest
 import fakeredis
 import tempfile
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from pathlib import Path
 
 from app.core.config import get_settings
 from app.services.redis import RedisService, redis_service
 from app.services.document import DocumentService, document_service
 
+# Jobs known to the mocked Redis service, keyed by job ID
+_JOB_STATES = {}
+
 
 @pytest.fixture
 def test_settings():
@@ -29,20 +32,17 @@ def test_settings():
 @pytest.fixture
 def mock_redis_service():
     """Mock Redis service with fakeredis."""
-    # Create a mock for redis_service with all required methods
-    mock_service = MagicMock()
+    # Create a mock for redis_service with all required (async) methods
+    mock_service = AsyncMock()
     
     # Mock common methods
-    mock_service.add_to_stream.return_value = "1-0"
+    mock_service.enqueue_jobs.return_value = ["1-0"]
     mock_service.set_job_status.return_value = None
-    mock_service.get_job_status.return_value = {
-        "status": "pending",
-        "markdown": "",
-        "summary": ""
-    }
+    # Job lookups answer from _JOB_STATES; unknown job IDs are not found
+    mock_service.get_job_status.side_effect = lambda job_id, *args, **kwargs: _JOB_STATES.get(job_id)
     
     # Create a mock connection and ping method
-    mock_connection = MagicMock()
+    mock_connection = AsyncMock()
     mock_connection.ping.return_value = True
     mock_connection.hset.return_value = 1
     mock_connection.hgetall.return_value = {
@@ -60,6 +60,14 @@ def mock_redis_service():
                     yield mock_service
 
 
+@pytest.fixture
+def stub_status(monkeypatch, mock_redis_service):
+    """Store a job for mock_redis_service.get_job_status to return during this test."""
+    def _set(job_id, job_data):
+        monkeypatch.setitem(_JOB_STATES, job_id, job_data)
+    return _set
+
+
 @pytest.fixture
 def test_upload_dir():
     """Create a temporary upload directory for tests."""
@@ -73,15 +81,15 @@ def test_upload_dir():
             del os.environ["UPLOAD_DIR"]
 
 
-@pytest.fixture
-def sample_pdf_path(test_upload_dir):
-    """Create a sample PDF file at a temporary location."""
+@pytest.fixture(scope="session")
+def sample_pdf_path(tmp_path_factory):
+    """Create a sample PDF file once per test session; tests must not modify it."""
     from .data.create_sample_pdf import create_sample_pdf
     
-    pdf_path = test_upload_dir / "sample.pdf"
+    pdf_path = tmp_path_factory.mktemp("pdfs") / "sample.pdf"
     create_sample_pdf(str(pdf_path))
     
-    yield pdf_path
+    return pdf_path
 
 
 @pytest.fixture
@@ -94,14 +102,25 @@ def mock_gemini():
         mock_model.generate_content.return_value = mock_response
         mock_model_class.return_value = mock_model
         
-        with patch('app.services.document.settings.GEMINI_API_KEY', "fake_api_key"):
+        # Drop the singleton's cached model so it is rebuilt from the mock, and
+        # skip the structured-text fast path so the Gemini call is exercised
+        with patch('app.services.document.settings.GEMINI_API_KEY', "fake_api_key"), \
+                patch('app.services.document.settings.GEMINI_MD_FAST_PATH', False), \
+                patch.object(document_service, '_gemini_model', None):
             yield mock_model_class
 
 
-@pytest.fixture
-def client(test_settings, mock_redis_service, mock_gemini):
-    """Create a test client."""
+@pytest.fixture(scope="module")
+def app_client():
+    """Test client shared by the tests of a module, entered once so its event loop portal is reused."""
     from fastapi.testclient import TestClient
     from app.main import app
     
-    return TestClient(app) 
\ No newline at end of file
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def client(app_client, test_settings, mock_redis_service):
+    """Get the shared test client with Redis mocked for this test."""
+    return app_client 
\ No newline at end of file
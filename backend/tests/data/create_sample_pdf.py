@@ -3,23 +3,18 @@
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 import os
+from functools import lru_cache
+from io import BytesIO
 from pathlib import Path
 
 
-def create_sample_pdf(output_path: str) -> None:
-    """
-    Create a sample PDF file for testing.
-    
-    Args:
-        output_path: Path where to save the PDF file
-    """
-    # Create directory if it doesn't exist
-    output_dir = os.path.dirname(output_path)
-    if output_dir:
-        os.makedirs(output_dir, exist_ok=True)
+@lru_cache(maxsize=1)
+def _build_sample_pdf_bytes() -> bytes:
+    """Render the sample PDF once; every test gets a copy of the same bytes."""
+    buffer = BytesIO()
     
     # Create a new PDF with Reportlab
-    c = canvas.Canvas(output_path, pagesize=letter)
+    c = canvas.Canvas(buffer, pagesize=letter)
     
     # Add content to the PDF
     c.setFont("Helvetica", 16)
@@ -52,8 +47,24 @@ def create_sample_pdf(output_path: str) -> None:
     c.drawString(100, 700, "This is the second page of the test document.")
     c.drawString(100, 680, "It tests the multi-page extraction capabilities of the service.")
     
-    # Save the PDF
     c.save()
+    return buffer.getvalue()
+
+
+def create_sample_pdf(output_path: str) -> None:
+    """
+    Create a sample PDF file for testing.
+    
+    Args:
+        output_path: Path where to save the PDF file
+    """
+    # Create directory if it doesn't exist
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    
+    # Save the PDF
+    Path(output_path).write_bytes(_build_sample_pdf_bytes())
     print(f"Sample PDF created at: {output_path}")
 
 
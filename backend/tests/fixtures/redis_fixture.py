@@ -1,6 +1,7 @@
 """Redis fixtures for testing."""
 
-import pytest
+import pytest_asyncio
+import fakeredis
 import fakeredis.aioredis
 from typing import AsyncGenerator
 
@@ -10,22 +11,20 @@ from app.services.redis import RedisService
 settings = get_settings()
 
 
-@pytest.fixture
+@pytest_asyncio.fixture
 async def redis_service() -> AsyncGenerator[RedisService, None]:
     """Create a Redis service using fakeredis for testing."""
     # Create a fake Redis server
-    server = fakeredis.aioredis.FakeRedisServer()
-    
-    # Create a Redis service with the fake server
-    service = RedisService(
-        host=server.host,
-        port=server.port
-    )
-    
+    server = fakeredis.FakeServer()
+
+    # Create a Redis service whose connection talks to the fake server
+    service = RedisService()
+    service._connection = fakeredis.aioredis.FakeRedis(server=server)
+
     # Create the document stream and consumer group
     conn = service.connection
     try:
-        conn.xgroup_create(
+        await conn.xgroup_create(
             settings.DOCUMENT_STREAM,
             settings.DOCUMENT_CONSUMER_GROUP,
             id="0",
@@ -34,8 +33,8 @@ async def redis_service() -> AsyncGenerator[RedisService, None]:
     except Exception:
         # Group might already exist
         pass
-    
+
     yield service
-    
+
     # Cleanup
-    await service.connection.close() 
\ No newline at end of file
+    await service.connection.aclose()
@@ -15,7 +15,7 @@ from app.schemas import ParserType
 def redis_service():
     # Minimal stub for redis_service
     mock = MagicMock()
-    mock.add_to_stream = MagicMock()
+    mock.enqueue_jobs = MagicMock()
     mock.get_job_status = MagicMock(return_value={"status": "done", "markdown": "Test", "summary": "Test"})
     return mock
 
@@ -37,13 +37,13 @@ async def test_document_processing(redis_service, tmp_path):
     try:
         # Add job to Redis stream
         job_id = "test-job-123"
-        redis_service.add_to_stream(
+        redis_service.enqueue_jobs(
             "documents",
-            {
+            [{
                 "job_id": job_id,
                 "parser": ParserType.PYPDF.value,
                 "filepath": str(pdf_path)
-            }
+            }]
         )
         
         # Wait for processing (max 10 seconds)
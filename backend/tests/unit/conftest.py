@@ -22,19 +22,15 @@ def test_env():
         yield
 
 
-@pytest.fixture
-def sample_pdf_path(tmp_path):
-    """Create a sample PDF file at a temporary location."""
+@pytest.fixture(scope="session")
+def sample_pdf_path(tmp_path_factory):
+    """Create a sample PDF file once per test session; tests must not modify it."""
     from ..data.create_sample_pdf import create_sample_pdf
     
-    pdf_path = tmp_path / "sample.pdf"
+    pdf_path = tmp_path_factory.mktemp("pdfs") / "sample.pdf"
     create_sample_pdf(str(pdf_path))
     
-    yield pdf_path
-    
-    # Cleanup
-    if pdf_path.exists():
-        pdf_path.unlink()
+    return pdf_path
 
 
 @pytest.fixture
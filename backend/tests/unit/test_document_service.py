@@ -1,96 +1,259 @@
 """Unit tests for document service."""
 
+import re
 import pytest
-from unittest.mock import patch, MagicMock
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock, AsyncMock
 
-from app.services.document import DocumentService, document_service
+from app.services.document import FallbackText, document_service
 from app.schemas import ParserType
 
+pytestmark = pytest.mark.unit
 
-@pytest.fixture
+# Text the sample PDF's extraction must contain
+_PYPDF_ASSERTIONS = (
+    "PDF Document Processor - Test Document",
+    "sample PDF file created for testing",
+    "multi-page extraction",  # From page 2
+    "Page 2 - Additional Information",
+)
+_GEMINI_ASSERTIONS = ("Mocked Markdown", "mocked", "Section 1")
+# Any of these marks a reply produced by the mocked Gemini model
+_GEMINI_OK = re.compile(r"Mocked Markdown|mocked")
+
+# Fixed Mistral chat response; only the chat callable itself needs to be a mock
+_MISTRAL_OK = SimpleNamespace(choices=[
+    SimpleNamespace(message=SimpleNamespace(content="Enhanced OCR text from Mistral"))
+])
+
+
+@pytest.fixture(scope="module")
 def mock_mistral():
-    """Mock Mistral API client."""
-    with patch('app.services.document.MistralClient') as mock:
-        mock_instance = MagicMock()
-        mock.return_value = mock_instance
-        mock_instance.chat.return_value.choices = [
-            MagicMock(message=MagicMock(content="Enhanced OCR text from Mistral"))
-        ]
-        yield mock_instance
-
-
-@pytest.mark.unit
-def test_extract_with_pypdf(sample_pdf_path):
-    """Test PyPDF extraction."""
-    # Call the function
+    """Mock Mistral API client, built once per module."""
+    mock_client = MagicMock()
+    mock_client.chat.return_value = _MISTRAL_OK
+    return mock_client
+
+
+@pytest.fixture
+def mistral_client_patched(mock_mistral, monkeypatch):
+    """Install the mock Mistral client (sync and async) with an API key for one test."""
+    mock_mistral.reset_mock()
+    monkeypatch.setattr("app.services.document.settings.MISTRAL_API_KEY", "dummy-key")
+    monkeypatch.setattr(document_service, "mistral_client", mock_mistral)
+    monkeypatch.setattr(document_service, "mistral_async_client", mock_mistral)
+    return mock_mistral
+
+
+@pytest.fixture
+def mock_llm_cache():
+    """Mock the Redis-backed LLM response cache (always a miss by default)."""
+    with patch('app.services.document.redis_service') as mock:
+        mock.get_llm_cache = AsyncMock(return_value=None)
+        mock.set_llm_cache = AsyncMock()
+        yield mock
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("parser,expected", [
+    (ParserType.PYPDF, _PYPDF_ASSERTIONS),
+    (ParserType.GEMINI, _GEMINI_ASSERTIONS),
+])
+def test_extract_with_parser(sample_pdf_path, mock_gemini, parser, expected):
+    """Test extraction with the local and Gemini (mocked) parsers."""
+    result = document_service.get_parser_function(parser)(sample_pdf_path)
+    
+    assert all(text in result for text in expected), result
+
+
+@pytest.mark.slow
+def test_extract_with_pypdf_parallel(sample_pdf_path, monkeypatch):
+    """Test PyMuPDF extraction split across the process pool."""
+    monkeypatch.setattr("app.services.document.settings.PDF_EXTRACT_WORKERS", 2)
+    monkeypatch.setattr("app.services.document.settings.PDF_PARALLEL_MIN_PAGES", 1)
+    
     result = document_service.extract_with_pypdf(sample_pdf_path)
     
-    # Assert expected content in result
+    # Pages come back in order
+    assert result.index("--- Page 1 ---") < result.index("--- Page 2 ---")
     assert "PDF Document Processor - Test Document" in result
-    assert "sample PDF file created for testing" in result
-    assert "multi-page extraction" in result  # From page 2
     assert "Page 2 - Additional Information" in result
 
 
-@pytest.mark.unit
-def test_extract_with_gemini(sample_pdf_path, mock_gemini):
-    """Test Gemini extraction with mocked API response."""
-    # Call the function
+@pytest.mark.parametrize("backend", ["pymupdf", "pypdf2"])
+def test_extract_with_pypdf_from_bytes(sample_pdf_path, monkeypatch, backend):
+    """Test extraction straight from in-memory PDF bytes."""
+    monkeypatch.setattr("app.services.document.settings.PDF_BACKEND", backend)
+    pdf_bytes = sample_pdf_path.read_bytes()
+    
+    for pdf_buffer in (pdf_bytes, memoryview(pdf_bytes)):
+        result = document_service.extract_with_pypdf(pdf_buffer)
+        assert "PDF Document Processor - Test Document" in result
+
+
+def test_extract_with_gemini_structured_fast_path(sample_pdf_path, mock_gemini, monkeypatch):
+    """Test that a PDF with clear headings is converted without calling Gemini."""
+    monkeypatch.setattr("app.services.document.settings.GEMINI_MD_FAST_PATH", True)
+    
     result = document_service.extract_with_gemini(sample_pdf_path)
     
-    # Assert expected content in result
+    assert "# PDF Document Processor - Test Document" in result
+    assert "- PyPDF2 for basic text extraction" in result
+    mock_gemini.return_value.generate_content.assert_not_called()
+
+
+@pytest.mark.parametrize("scenario,expected", [
+    ("no_key", "Stubbed Mistral OCR output"),
+    ("ok", "Enhanced OCR text from Mistral"),
+    # An API error falls back to the PyPDF extraction
+    ("api_error", "PDF Document Processor - Test Document"),
+])
+def test_extract_with_mistral(sample_pdf_path, mistral_client_patched, monkeypatch, scenario, expected):
+    """Test Mistral extraction without an API key, with the (mocked) API, and on an API error."""
+    if scenario == "no_key":
+        monkeypatch.setattr("app.services.document.settings.MISTRAL_API_KEY", None)
+    elif scenario == "api_error":
+        monkeypatch.setattr(mistral_client_patched.chat, "side_effect", Exception("API Error"))
+    
+    result = document_service.extract_with_mistral(sample_pdf_path)
+    assert expected in result
+    # Only real Mistral output counts as the parser's own result
+    assert isinstance(result, FallbackText) == (scenario != "ok")
+    
+    # Verify Mistral API was called only when a key is configured
+    assert mistral_client_patched.chat.call_count == (0 if scenario == "no_key" else 1)
+
+
+@pytest.mark.asyncio
+async def test_extract_with_gemini_async(sample_pdf_path, mock_gemini, mock_llm_cache):
+    """Test async Gemini extraction with mocked API response."""
+    mock_model = mock_gemini.return_value
+    mock_model.generate_content_async = AsyncMock(return_value=mock_model.generate_content.return_value)
+    
+    result = await document_service.extract_with_gemini_async(sample_pdf_path)
+    
     assert "Mocked Markdown" in result
-    assert "mocked" in result
-    assert "Section 1" in result
+    mock_model.generate_content_async.assert_awaited_once()
+    mock_llm_cache.set_llm_cache.assert_awaited_once()
 
 
-@pytest.mark.unit
-def test_extract_with_mistral_no_api_key(sample_pdf_path):
-    """Test Mistral extraction without API key (stubbed)."""
-    # Temporarily remove API key
-    original_key = document_service.mistral_client
-    document_service.mistral_client = None
+@pytest.mark.asyncio
+async def test_summarize_with_gemini_async_cache_hit(mock_gemini, mock_llm_cache):
+    """Test that a cached summary skips the Gemini call."""
+    mock_llm_cache.get_llm_cache.return_value = "Cached summary"
+    mock_model = mock_gemini.return_value
+    mock_model.generate_content_async = AsyncMock()
     
-    try:
-        result = document_service.extract_with_mistral(sample_pdf_path)
-        assert "Stubbed Mistral OCR output" in result
-    finally:
-        # Restore API key
-        document_service.mistral_client = original_key
+    result = await document_service.summarize_with_gemini_async("Some content")
+    
+    assert result == "Cached summary"
+    mock_model.generate_content_async.assert_not_awaited()
 
 
-@pytest.mark.unit
-def test_extract_with_mistral_with_api_key(sample_pdf_path, mock_mistral, monkeypatch):
-    """Test Mistral extraction with API key (mocked)."""
-    # Patch settings to simulate API key
-    monkeypatch.setattr("app.services.document.settings.MISTRAL_API_KEY", "dummy-key")
-    # Set up mock client
-    document_service.mistral_client = mock_mistral
+@pytest.mark.asyncio
+async def test_summarize_with_gemini_async_long_content(mock_gemini, mock_llm_cache, monkeypatch):
+    """Test that long content is summarized per chunk and then combined."""
+    monkeypatch.setattr("app.services.document.settings.SUMMARY_CHUNK_CHARS", 100)
+    monkeypatch.setattr("app.services.document.settings.SUMMARY_CHUNK_OVERLAP", 10)
+    mock_model = mock_gemini.return_value
+    mock_model.generate_content_async = AsyncMock(return_value=MagicMock(text="Partial summary"))
+    content = "\n\n".join(f"Paragraph {i} " + "text " * 10 for i in range(6))
     
-    result = document_service.extract_with_mistral(sample_pdf_path)
-    assert "Enhanced OCR text from Mistral" in result
+    result = await document_service.summarize_with_gemini_async(content)
     
-    # Verify Mistral API was called
-    mock_mistral.chat.assert_called_once()
+    assert result == "Partial summary"
+    # One call per chunk plus the final combining call
+    assert mock_model.generate_content_async.await_count > 2
+    final_prompt = mock_model.generate_content_async.await_args.args[0]
+    assert "Partial summary\n\nPartial summary" in final_prompt
 
 
-@pytest.mark.unit
-def test_extract_with_mistral_api_error(sample_pdf_path, mock_mistral, monkeypatch):
-    """Test Mistral extraction with API error (fallback to PyPDF)."""
-    # Patch settings to simulate API key
-    monkeypatch.setattr("app.services.document.settings.MISTRAL_API_KEY", "dummy-key")
-    # Set up mock to raise exception
-    mock_mistral.chat.side_effect = Exception("API Error")
+@pytest.mark.asyncio
+async def test_summarize_with_gemini_async_trims_content(mock_gemini, mock_llm_cache, monkeypatch):
+    """Test that content over the summary budget keeps only its head and tail."""
+    monkeypatch.setattr("app.services.document.settings.SUMMARY_MAX_CHARS", 20)
+    mock_model = mock_gemini.return_value
+    mock_model.generate_content_async = AsyncMock(return_value=MagicMock(text="Summary"))
     
-    # Set up mock client
-    document_service.mistral_client = mock_mistral
+    result = await document_service.summarize_with_gemini_async("HEAD" + "x" * 100 + "TAIL")
+    
+    assert result == "Summary"
+    prompt = mock_model.generate_content_async.await_args.args[0]
+    assert "HEADxxxxxx\n...\nxxxxxxTAIL" in prompt
+
+
+@pytest.mark.asyncio
+async def test_summarize_with_gemini_async_semantic_hit(mock_gemini, mock_llm_cache, monkeypatch):
+    """Test that a summary of near-duplicate content skips the Gemini call."""
+    monkeypatch.setattr("app.services.document.settings.SEMANTIC_CACHE_ENABLED", True)
+    monkeypatch.setattr("app.services.document.genai.embed_content", lambda **kwargs: {"embedding": [0.1] * 768})
+    mock_llm_cache.find_similar_summary = AsyncMock(return_value=("Similar summary", 0.97))
+    mock_model = mock_gemini.return_value
+    mock_model.generate_content_async = AsyncMock()
+    
+    result = await document_service.summarize_with_gemini_async("Some content")
+    
+    assert result == "Similar summary"
+    mock_model.generate_content_async.assert_not_awaited()
+    mock_llm_cache.get_llm_cache.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_summarize_batch_async(mock_gemini, mock_llm_cache):
+    """Test that several documents are summarized with one Gemini call."""
+    mock_model = mock_gemini.return_value
+    mock_model.generate_content_async = AsyncMock(return_value=MagicMock(
+        text='[{"id": "a", "summary": "Summary A"}, {"id": "b", "summary": "Summary B"}]'
+    ))
+    
+    result = await document_service.summarize_batch_async([("a", "Content A"), ("b", "Content B")])
+    
+    assert result == {"a": "Summary A", "b": "Summary B"}
+    mock_model.generate_content_async.assert_awaited_once()
+    assert mock_llm_cache.set_llm_cache.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_summarize_batch_async_invalid_json(mock_gemini, mock_llm_cache):
+    """Test that an unparsable batch reply falls back to per-document calls."""
+    mock_model = mock_gemini.return_value
+    mock_model.generate_content_async = AsyncMock(side_effect=[
+        MagicMock(text="not json"),
+        MagicMock(text="Summary"),
+        MagicMock(text="Summary")
+    ])
+    
+    result = await document_service.summarize_batch_async([("a", "Content A"), ("b", "Content B")])
+    
+    assert result == {"a": "Summary", "b": "Summary"}
+    assert mock_model.generate_content_async.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_extract_with_mistral_async_with_api_key(sample_pdf_path, mistral_client_patched, monkeypatch):
+    """Test async Mistral extraction with API key (mocked)."""
+    chat = AsyncMock(return_value=_MISTRAL_OK)
+    monkeypatch.setattr(mistral_client_patched, "chat", chat)
+    
+    result = await document_service.extract_with_mistral_async(sample_pdf_path)
+    assert "Enhanced OCR text from Mistral" in result
+    chat.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_extract_with_mistral_async_api_error(sample_pdf_path, mistral_client_patched, monkeypatch):
+    """Test that the async Mistral fallback reuses the text extracted for the request."""
+    monkeypatch.setattr(mistral_client_patched, "chat", AsyncMock(side_effect=Exception("API Error")))
+    extract = MagicMock(wraps=document_service.extract_with_pypdf)
+    monkeypatch.setattr(document_service, "extract_with_pypdf", extract)
+    
+    result = await document_service.extract_with_mistral_async(sample_pdf_path)
     
-    result = document_service.extract_with_mistral(sample_pdf_path)
-    # Should fall back to PyPDF2 extraction
     assert "PDF Document Processor - Test Document" in result
+    assert isinstance(result, FallbackText)
+    extract.assert_called_once()
 
 
-@pytest.mark.unit
 def test_summarize_with_gemini(mock_gemini):
     """Test summarization with mocked Gemini API."""
     # Test input
@@ -100,30 +263,5 @@ def test_summarize_with_gemini(mock_gemini):
     result = document_service.summarize_with_gemini(test_content)
     
     # Assert summary generated
-    assert "Mocked Markdown" in result or "mocked" in result
+    assert _GEMINI_OK.search(result)
     assert "Section 1" in result
-
-
-@pytest.mark.unit
-def test_get_parser_function():
-    """Test getting parser functions."""
-    service = DocumentService()
-    
-    # Test PyPDF parser
-    parser_func = service.get_parser_function(ParserType.PYPDF)
-    assert callable(parser_func)
-    assert parser_func == service.extract_with_pypdf
-    
-    # Test Gemini parser
-    parser_func = service.get_parser_function(ParserType.GEMINI)
-    assert callable(parser_func)
-    assert parser_func == service.extract_with_gemini
-    
-    # Test Mistral parser
-    parser_func = service.get_parser_function(ParserType.MISTRAL)
-    assert callable(parser_func)
-    assert parser_func == service.extract_with_mistral
-    
-    # Test invalid parser
-    with pytest.raises(ValueError):
-        service.get_parser_function("invalid_parser") 
\ No newline at end of file
@@ -1,23 +1,30 @@
 """Unit tests for API endpoints."""
 
 import pytest
+from io import BytesIO
+from unittest.mock import AsyncMock
 from fastapi.testclient import TestClient
 
+from app.core.config import get_settings
+from ..fixtures.redis_fixture import redis_service  # noqa: F401
 
-@pytest.mark.unit
-def test_upload_file_success(client, tmp_path, mock_redis_service):
+pytestmark = pytest.mark.unit
+
+_TINY_PDF = b"%PDF-1.4\nTest PDF content"
+
+
+def _tiny_pdf() -> BytesIO:
+    """Fresh upload stream over the shared tiny PDF bytes."""
+    return BytesIO(_TINY_PDF)
+
+
+def test_upload_file_success(client, mock_redis_service):
     """Test successful file upload."""
-    # Create a test PDF file
-    pdf_path = tmp_path / "test.pdf"
-    pdf_path.write_bytes(b"%PDF-1.4\nTest PDF content")
-    
-    # Upload file
-    with open(pdf_path, "rb") as f:
-        response = client.post(
-            "/api/v1/documents/upload",
-            files={"files": ("test.pdf", f, "application/pdf")},
-            data={"parser": "pypdf"}
-        )
+    response = client.post(
+        "/api/v1/documents/upload",
+        files={"files": ("test.pdf", _tiny_pdf(), "application/pdf")},
+        data={"parser": "pypdf"}
+    )
     
     # Assert response
     assert response.status_code == 202
@@ -27,7 +34,25 @@ def test_upload_file_success(client, tmp_path, mock_redis_service):
     assert "filename" in data[0]
 
 
-@pytest.mark.unit
+def test_upload_file_streamed_in_chunks(client, mock_redis_service, monkeypatch):
+    """Test that uploads reach Redis chunk by chunk rather than as one body."""
+    monkeypatch.setattr("app.api.endpoints.documents.settings.UPLOAD_CHUNK_SIZE", 8)
+    # Chunks are views over a reused buffer, so copy them as they arrive
+    received = []
+    mock_redis_service.append_pdf.side_effect = lambda job_id, chunk: received.append(bytes(chunk))
+    
+    response = client.post(
+        "/api/v1/documents/upload",
+        files={"files": ("test.pdf", _tiny_pdf(), "application/pdf")},
+        data={"parser": "pypdf"}
+    )
+    
+    assert response.status_code == 202
+    assert len(received) == -(-len(_TINY_PDF) // 8)
+    assert all(len(chunk) <= 8 for chunk in received)
+    assert b"".join(received) == _TINY_PDF
+
+
 def test_upload_file_missing(client):
     """Test file upload with missing file."""
     response = client.post(
@@ -38,32 +63,68 @@ def test_upload_file_missing(client):
     assert response.status_code == 422
 
 
-@pytest.mark.unit
-def test_upload_file_invalid_parser(client, tmp_path):
+def test_upload_file_invalid_parser(client):
     """Test file upload with invalid parser."""
-    # Create a test PDF file
-    pdf_path = tmp_path / "test.pdf"
-    pdf_path.write_bytes(b"%PDF-1.4\nTest PDF content")
-    
-    # Upload file with invalid parser
-    with open(pdf_path, "rb") as f:
-        response = client.post(
-            "/api/v1/documents/upload",
-            files={"files": ("test.pdf", f, "application/pdf")},
-            data={"parser": "invalid_parser"}
-        )
+    response = client.post(
+        "/api/v1/documents/upload",
+        files={"files": ("test.pdf", _tiny_pdf(), "application/pdf")},
+        data={"parser": "invalid_parser"}
+    )
     
     assert response.status_code == 400
     data = response.json()
     assert "detail" in data
 
 
-@pytest.mark.unit
-def test_get_status_not_found(client, mock_redis_service):
-    """Test getting status for non-existent job."""
-    # Configure mock for this test case
-    mock_redis_service.get_job_status.return_value = None
+def test_upload_file_too_large(client, mock_redis_service, monkeypatch):
+    """Test file upload exceeding the maximum upload size."""
+    monkeypatch.setattr("app.api.endpoints.documents.settings.MAX_UPLOAD_BYTES", 8)
+
+    response = client.post(
+        "/api/v1/documents/upload",
+        files={"files": ("test.pdf", _tiny_pdf(), "application/pdf")},
+        data={"parser": "pypdf"}
+    )
+
+    assert response.status_code == 413
+    mock_redis_service.delete_pdf.assert_called_once()
+    mock_redis_service.enqueue_jobs.assert_not_called()
+
+
+def test_upload_file_enqueue_failure(client, mock_redis_service):
+    """Test that the stored PDFs are dropped when enqueueing the jobs fails."""
+    mock_redis_service.enqueue_jobs.side_effect = ConnectionError("Redis unavailable")
     
+    response = client.post(
+        "/api/v1/documents/upload",
+        files=[
+            ("files", ("a.pdf", _tiny_pdf(), "application/pdf")),
+            ("files", ("b.pdf", _tiny_pdf(), "application/pdf")),
+        ],
+        data={"parser": "pypdf"}
+    )
+    
+    assert response.status_code == 500
+    stored = {call.args[0] for call in mock_redis_service.append_pdf.await_args_list}
+    deleted = {call.args[0] for call in mock_redis_service.delete_pdf.await_args_list}
+    assert len(stored) == 2
+    assert deleted == stored
+
+
+def test_upload_file_invalid_filename(client, mock_redis_service):
+    """Test file upload with a hidden/relative file name."""
+    response = client.post(
+        "/api/v1/documents/upload",
+        files={"files": ("../.env", _TINY_PDF, "application/pdf")},
+        data={"parser": "pypdf"}
+    )
+
+    assert response.status_code == 400
+    mock_redis_service.append_pdf.assert_not_called()
+
+
+def test_get_status_not_found(client):
+    """Test getting status for non-existent job."""
     response = client.get("/api/v1/documents/nonexistent-job-id")
     
     assert response.status_code == 404
@@ -71,15 +132,13 @@ def test_get_status_not_found(client, mock_redis_service):
     assert "detail" in data
 
 
-@pytest.mark.unit
-def test_get_status_pending(client, mock_redis_service):
+def test_get_status_pending(client, stub_status):
     """Test getting status for pending job."""
-    # Configure mock for this test case  
-    mock_redis_service.get_job_status.return_value = {
+    stub_status("test-job-id", {
         "status": "pending",
         "markdown": "",
         "summary": ""
-    }
+    })
     
     response = client.get("/api/v1/documents/test-job-id")
     
@@ -90,7 +149,6 @@ def test_get_status_pending(client, mock_redis_service):
     assert data["summary"] == ""
 
 
-@pytest.mark.unit
 def test_health_check(client):
     """Test health check endpoint."""
     response = client.get("/health")
@@ -98,4 +156,66 @@ def test_health_check(client):
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "healthy"
-    assert data["redis"] == "connected" 
\ No newline at end of file
+    assert data["redis"] == "connected" 
+
+
+def test_health_check_cached(client, mock_redis_service, monkeypatch):
+    """Test that health checks reuse a recent successful Redis ping."""
+    monkeypatch.setattr("app.main._HEALTH", {"ok": False, "t": 0.0})
+    ping = mock_redis_service.connection.ping
+
+    assert client.get("/health").status_code == 200
+    assert client.get("/health").status_code == 200
+    assert ping.await_count == 1
+
+    # The deep check always pings Redis
+    response = client.get("/health/deep")
+    assert response.status_code == 200
+    assert response.json()["redis"] == "connected"
+    assert ping.await_count == 2
+
+
+def test_debug_streams(app_client, redis_service, monkeypatch):
+    """Test the debug endpoint against a stream whose consumer group exists."""
+    settings = get_settings()
+    monkeypatch.setattr("app.api.endpoints.documents.redis_service", redis_service)
+    # fakeredis does not implement INFO
+    monkeypatch.setattr(redis_service.connection, "info", AsyncMock(return_value={"connected_clients": 1}))
+    conn = redis_service.connection
+    
+    async def setup():
+        await redis_service.enqueue_jobs(settings.DOCUMENT_STREAM, [
+            {"job_id": "job-1", "parser": "pypdf", "filename": "a.pdf"},
+            {"job_id": "job-2", "parser": "pypdf", "filename": "b.pdf"},
+        ])
+        await redis_service.read_batch(
+            settings.DOCUMENT_STREAM, settings.DOCUMENT_CONSUMER_GROUP, "worker-1", count=1, block_ms=None
+        )
+    app_client.portal.call(setup)
+    
+    response = app_client.get("/api/v1/documents/debug/streams")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["stream_info"]["length"] == 2
+    assert data["stream_info"]["first_entry"][1]["job_id"] == "job-1"
+    assert data["consumer_groups"][0]["name"] == settings.DOCUMENT_CONSUMER_GROUP
+    assert data["consumer_groups"][0]["pending"] == 1
+    assert data["pending_messages"]["count"] == 1
+    assert data["pending_messages"]["consumers"] == [{"name": "worker-1", "count": 1}]
+    assert {job["job_id"] for job in data["job_statuses"]["pending"]} == {"job-1", "job-2"}
+
+
+def test_debug_streams_without_stream(app_client, redis_service, monkeypatch):
+    """Test the debug endpoint before any worker created the stream."""
+    monkeypatch.setattr("app.api.endpoints.documents.redis_service", redis_service)
+    monkeypatch.setattr(redis_service.connection, "info", AsyncMock(return_value={}))
+    app_client.portal.call(redis_service.connection.delete, get_settings().DOCUMENT_STREAM)
+    
+    response = app_client.get("/api/v1/documents/debug/streams")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["stream_info"]["length"] == 0
+    assert data["consumer_groups"] == []
+    assert data["pending_messages"] == {"count": 0, "min_id": None, "max_id": None, "consumers": []}
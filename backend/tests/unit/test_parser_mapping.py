@@ -0,0 +1,28 @@
+"""Unit tests for the parser type to parser function mapping."""
+
+import pytest
+
+from app.schemas import ParserType
+from app.services.document import document_service
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.mark.parametrize("parser,method", [
+    (ParserType.PYPDF, "extract_with_pypdf"),
+    (ParserType.GEMINI, "extract_with_gemini"),
+    (ParserType.MISTRAL, "extract_with_mistral"),
+])
+def test_get_parser_function(parser, method):
+    """Test getting parser functions."""
+    parser_func = document_service.get_parser_function(parser)
+    assert callable(parser_func)
+    assert parser_func == getattr(document_service, method)
+    # The mapping is built once, so lookups return the same bound method
+    assert document_service.get_parser_function(parser) is parser_func
+
+
+def test_get_parser_function_invalid():
+    """Test getting the parser function of an unknown parser."""
+    with pytest.raises(ValueError):
+        document_service.get_parser_function("invalid_parser")
@@ -0,0 +1,184 @@
+"""Unit tests for the Redis storage layout, run against fakeredis."""
+
+import os
+import time
+import pytest
+
+from app.core.config import get_settings
+from app.services.redis import COMPRESS_MIN_BYTES, ZSTD_MAGIC, JOB_STATUSES, job_index_key
+from ..fixtures.redis_fixture import redis_service  # noqa: F401
+
+pytestmark = pytest.mark.unit
+
+settings = get_settings()
+
+_PDF = b"%PDF-1.4\n" + bytes(range(256)) * 4
+
+
+async def _index_members(service, job_id):
+    """Statuses whose index set contains job_id."""
+    return {status for status in JOB_STATUSES if await service.connection.sismember(job_index_key(status), job_id)}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("compress", [True, False])
+async def test_job_blob_round_trip(redis_service, monkeypatch, compress):
+    """Test that large markdown is stored compressed and read back unchanged."""
+    monkeypatch.setattr(settings, "COMPRESS_JOB_BLOBS", compress)
+    markdown = "# Title\n\n" + "lorem ipsum " * COMPRESS_MIN_BYTES
+
+    await redis_service.set_job_fields("job-1", status="done", markdown=markdown, summary="short")
+
+    stored = await redis_service.connection.hgetall("job:job-1")
+    assert stored[b"markdown"].startswith(ZSTD_MAGIC) is compress
+    assert stored[b"summary"] == b"short"
+    assert int(stored[b"markdown_length"]) == len(markdown)
+    assert await redis_service.get_job_status("job-1") == {
+        "status": "done",
+        "markdown": markdown,
+        "summary": "short"
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size,chunked", [(1 << 20, False), (100, True)])
+async def test_set_pdf_round_trip(redis_service, monkeypatch, chunk_size, chunked):
+    """Test that small PDFs are stored as one value and large ones as a list of chunks."""
+    monkeypatch.setattr(settings, "PDF_CHUNK_SIZE", chunk_size)
+
+    await redis_service.set_pdf("job-1", _PDF)
+
+    conn = redis_service.connection
+    key = "pdf:job-1:chunks" if chunked else "pdf:job-1"
+    assert await conn.keys("pdf:*") == [key.encode()]
+    if chunked:
+        assert await conn.llen(key) == -(-len(_PDF) // chunk_size)
+    assert 0 < await conn.ttl(key) <= settings.PDF_TTL
+    assert await redis_service.get_pdf("job-1") == _PDF
+
+    await redis_service.delete_pdf("job-1")
+    with pytest.raises(FileNotFoundError):
+        await redis_service.get_pdf("job-1")
+
+
+@pytest.mark.asyncio
+async def test_append_pdf_round_trip(redis_service):
+    """Test that appended chunks are copied on send and reassembled in order."""
+    buffer = bytearray(100)
+    view = memoryview(buffer)
+    for offset in range(0, len(_PDF), 100):
+        chunk = _PDF[offset:offset + 100]
+        buffer[:len(chunk)] = chunk
+        chunk_count = await redis_service.append_pdf("job-1", view[:len(chunk)])
+
+    assert chunk_count == -(-len(_PDF) // 100)
+    assert await redis_service.get_pdf("job-1") == _PDF
+
+
+@pytest.mark.asyncio
+async def test_pdf_store_dir_round_trip(redis_service, monkeypatch, tmp_path):
+    """Test that PDFs go to PDF_STORE_DIR instead of Redis when it is set."""
+    monkeypatch.setattr(settings, "PDF_STORE_DIR", str(tmp_path))
+
+    await redis_service.set_pdf("job-1", _PDF[:100])
+    await redis_service.append_pdf("job-2", _PDF[:100])
+    await redis_service.append_pdf("job-2", _PDF[100:])
+
+    assert await redis_service.connection.keys("pdf:*") == []
+    assert await redis_service.get_pdf("job-1") == _PDF[:100]
+    assert await redis_service.get_pdf("job-2") == _PDF
+
+    await redis_service.delete_pdf("job-2")
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["job-1.pdf"]
+
+
+@pytest.mark.asyncio
+async def test_status_index_membership(redis_service):
+    """Test that every status change moves a job to exactly one index set."""
+    await redis_service.enqueue_jobs(settings.DOCUMENT_STREAM, [
+        {"job_id": "job-1", "parser": "pypdf", "filename": "a.pdf"},
+        {"job_id": "job-2", "parser": "pypdf", "filename": "b.pdf"},
+    ])
+    assert await _index_members(redis_service, "job-1") == {"pending"}
+
+    await redis_service.set_job_statuses_bulk([
+        ("job-1", {"status": "processing"}),
+        ("job-2", {"status": "processing"}),
+    ])
+    await redis_service.set_job_status("job-2", "error", "failed", "failed")
+    assert await _index_members(redis_service, "job-1") == {"processing"}
+    assert await _index_members(redis_service, "job-2") == {"error"}
+
+    jobs = await redis_service.get_jobs_by_status()
+    assert [job["job_id"] for job in jobs["processing"]] == ["job-1"]
+    assert jobs["error"] == [{"job_id": "job-2", "markdown_length": 6, "summary_length": 6}]
+    assert jobs["pending"] == jobs["done"] == []
+
+
+@pytest.mark.asyncio
+async def test_get_jobs_by_status_drops_expired(redis_service):
+    """Test that IDs of expired job hashes are removed from the index sets."""
+    await redis_service.set_job_status("job-1", "done", "content", "summary")
+    await redis_service.connection.delete("job:job-1")
+
+    assert (await redis_service.get_jobs_by_status())["done"] == []
+    assert await _index_members(redis_service, "job-1") == set()
+
+
+@pytest.mark.asyncio
+async def test_finalize_jobs(redis_service):
+    """Test that finished jobs get a TTL and lose their PDF while others are untouched."""
+    for job_id in ("job-1", "job-2", "job-3"):
+        await redis_service.set_pdf(job_id, _PDF)
+        await redis_service.set_job_status(job_id, "processing")
+
+    await redis_service.finalize_jobs([
+        ("job-1", {"status": "done", "markdown": "content", "summary": "summary"}),
+        ("job-2", {"status": "error", "markdown": "failed", "summary": "failed"}),
+        ("job-3", {"status": "processing", "markdown": "partial"}),
+    ])
+
+    conn = redis_service.connection
+    for job_id, status in (("job-1", "done"), ("job-2", "error")):
+        assert 0 < await conn.ttl(f"job:{job_id}") <= settings.JOB_TTL
+        assert await _index_members(redis_service, job_id) == {status}
+        with pytest.raises(FileNotFoundError):
+            await redis_service.get_pdf(job_id)
+    assert await conn.ttl("job:job-3") == -1
+    assert await redis_service.get_pdf("job-3") == _PDF
+
+
+@pytest.mark.asyncio
+async def test_delete_expired_pdf_files(redis_service, monkeypatch, tmp_path):
+    """Test that PDFs stored on disk for longer than PDF_TTL are swept."""
+    monkeypatch.setattr(settings, "PDF_STORE_DIR", str(tmp_path))
+    for job_id in ("old", "new"):
+        await redis_service.set_pdf(job_id, _PDF)
+    expired = time.time() - settings.PDF_TTL - 60
+    os.utime(tmp_path / "old.pdf", (expired, expired))
+
+    assert await redis_service.delete_expired_pdf_files() == 1
+    assert [path.name for path in tmp_path.iterdir()] == ["new.pdf"]
+
+
+@pytest.mark.asyncio
+async def test_trim_acknowledged(redis_service, monkeypatch):
+    """Test that entries up to the oldest pending one are trimmed."""
+    conn = redis_service.connection
+    # fakeredis ignores approximate trimming, so trim exactly to observe the cut-off
+    xtrim = conn.xtrim
+    monkeypatch.setattr(conn, "xtrim", lambda name, **kwargs: xtrim(name, **{**kwargs, "approximate": False}))
+
+    stream, group = settings.DOCUMENT_STREAM, settings.DOCUMENT_CONSUMER_GROUP
+    entry_ids = [await conn.xadd(stream, {"n": i}) for i in range(4)]
+    await redis_service.read_batch(stream, group, "consumer", count=4, block_ms=None)
+    await conn.xack(stream, group, *entry_ids[:2])
+
+    # The oldest pending entry bounds the trim
+    assert await redis_service.trim_acknowledged(stream) == 2
+    assert [entry_id for entry_id, _ in await conn.xrange(stream)] == entry_ids[2:]
+
+    # With nothing pending, everything up to the last delivered entry goes
+    await conn.xack(stream, group, *entry_ids[2:])
+    assert await redis_service.trim_acknowledged(stream) == 1
+    assert [entry_id for entry_id, _ in await conn.xrange(stream)] == entry_ids[3:]
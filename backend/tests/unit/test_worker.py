@@ -0,0 +1,172 @@
+"""Unit tests for the batch processing path of the worker, run against fakeredis."""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.core.config import get_settings
+from app import worker
+from app.services.document import FallbackText
+from ..fixtures.redis_fixture import redis_service  # noqa: F401
+
+pytestmark = pytest.mark.unit
+
+settings = get_settings()
+
+
+async def _parse(pdf_bytes):
+    """Stand-in parser returning the PDF body, failing on PDFs marked as broken."""
+    if b"broken" in pdf_bytes:
+        raise ValueError("unreadable PDF")
+    return pdf_bytes.decode()
+
+
+@pytest.fixture
+def worker_redis(redis_service, monkeypatch):
+    """Point the worker at the fakeredis-backed service."""
+    monkeypatch.setattr(worker, "redis_service", redis_service)
+    return redis_service
+
+
+@pytest.fixture
+def mock_document_service(monkeypatch):
+    """Replace the document service with a stub parser and batch summarizer."""
+    service = MagicMock()
+    service.get_parser_function.return_value = _parse
+    service.summarize_batch_async = AsyncMock(
+        side_effect=lambda documents: {job_id: f"summary of {content}" for job_id, content in documents}
+    )
+    monkeypatch.setattr(worker, "document_service", service)
+    return service
+
+
+async def _read_jobs(service, pdfs, consumer="consumer"):
+    """Store and enqueue one pypdf job per PDF body, then read the entries as consumer."""
+    jobs = [{"job_id": job_id, "parser": "pypdf", "filename": f"{job_id}.pdf"} for job_id in pdfs]
+    for job_id, pdf_bytes in pdfs.items():
+        await service.set_pdf(job_id, pdf_bytes)
+    await service.enqueue_jobs(settings.DOCUMENT_STREAM, jobs)
+    return await service.read_batch(
+        settings.DOCUMENT_STREAM,
+        settings.DOCUMENT_CONSUMER_GROUP,
+        consumer,
+        count=len(jobs),
+        block_ms=None
+    )
+
+
+async def _pending_count(service):
+    """Number of entries read but not acknowledged by the consumer group."""
+    pending = await service.connection.xpending(settings.DOCUMENT_STREAM, settings.DOCUMENT_CONSUMER_GROUP)
+    return pending["pending"]
+
+
+@pytest.mark.asyncio
+async def test_handle_messages_success(worker_redis, mock_document_service):
+    """Test that a batch is extracted, summarized in one call, stored and acknowledged."""
+    messages = await _read_jobs(worker_redis, {"job-1": b"first", "job-2": b"second"})
+
+    await worker.handle_messages("consumer", messages)
+
+    assert await worker_redis.get_job_status("job-1") == {
+        "status": "done",
+        "markdown": "first",
+        "summary": "summary of first"
+    }
+    assert (await worker_redis.get_job_status("job-2"))["status"] == "done"
+    mock_document_service.summarize_batch_async.assert_awaited_once()
+    assert await worker_redis.connection.keys("pdf:*") == []
+    assert await _pending_count(worker_redis) == 0
+
+
+@pytest.mark.asyncio
+async def test_handle_messages_job_failure(worker_redis, mock_document_service):
+    """Test that a job failing extraction is marked as an error without failing its batch."""
+    messages = await _read_jobs(worker_redis, {"job-1": b"first", "job-2": b"broken"})
+
+    await worker.handle_messages("consumer", messages)
+
+    assert (await worker_redis.get_job_status("job-1"))["status"] == "done"
+    failed = await worker_redis.get_job_status("job-2")
+    assert failed["status"] == "error"
+    assert "unreadable PDF" in failed["markdown"]
+    assert await worker_redis.connection.keys("pdf:*") == []
+    # Only the extracted document is summarized
+    mock_document_service.summarize_batch_async.assert_awaited_once_with([("job-1", "first")])
+    assert await _pending_count(worker_redis) == 0
+
+
+@pytest.mark.asyncio
+async def test_handle_messages_summary_failure(worker_redis, mock_document_service):
+    """Test that jobs are marked as errors when batch summarization fails."""
+    mock_document_service.summarize_batch_async.side_effect = RuntimeError("quota exceeded")
+    messages = await _read_jobs(worker_redis, {"job-1": b"first"})
+
+    await worker.handle_messages("consumer", messages)
+
+    failed = await worker_redis.get_job_status("job-1")
+    assert failed["status"] == "error"
+    assert "quota exceeded" in failed["summary"]
+    assert await _pending_count(worker_redis) == 0
+
+
+@pytest.mark.asyncio
+async def test_handle_messages_finalize_failure(worker_redis, mock_document_service, monkeypatch):
+    """Test that a batch whose results cannot be stored stays pending with its PDFs."""
+    monkeypatch.setattr(worker_redis, "finalize_jobs", AsyncMock(side_effect=ConnectionError("Redis unavailable")))
+    messages = await _read_jobs(worker_redis, {"job-1": b"first"})
+
+    with pytest.raises(ConnectionError):
+        await worker.handle_messages("consumer", messages)
+
+    assert (await worker_redis.get_job_status("job-1"))["status"] == "processing"
+    assert await worker_redis.get_pdf("job-1") == b"first"
+    assert await _pending_count(worker_redis) == 1
+
+
+@pytest.mark.asyncio
+async def test_claim_stale_scans_whole_pending_list(worker_redis, mock_document_service, monkeypatch):
+    """Test that entries beyond the first claimed batch are reclaimed as well."""
+    monkeypatch.setattr(settings, "STREAM_CLAIM_MIN_IDLE_MS", 0)
+    monkeypatch.setattr(settings, "WORKER_BATCH_SIZE", 2)
+    await _read_jobs(worker_redis, {f"job-{i}": f"doc {i}".encode() for i in range(5)}, consumer="crashed")
+
+    await worker.claim_stale("consumer")
+
+    for i in range(5):
+        assert (await worker_redis.get_job_status(f"job-{i}"))["status"] == "done"
+    assert mock_document_service.summarize_batch_async.await_count == 3
+    assert await _pending_count(worker_redis) == 0
+
+
+@pytest.mark.asyncio
+async def test_claim_stale_skips_finished_jobs(worker_redis, mock_document_service, monkeypatch):
+    """Test that an entry claimed after its first owner finished the job leaves the result alone."""
+    monkeypatch.setattr(settings, "STREAM_CLAIM_MIN_IDLE_MS", 0)
+    await _read_jobs(worker_redis, {"job-1": b"first"}, consumer="slow")
+    # The first owner stores the result but has not acknowledged the entry yet
+    await worker_redis.finalize_jobs([("job-1", {"status": "done", "markdown": "first", "summary": "summary"})])
+
+    await worker.claim_stale("consumer")
+
+    assert await worker_redis.get_job_status("job-1") == {
+        "status": "done",
+        "markdown": "first",
+        "summary": "summary"
+    }
+    mock_document_service.get_parser_function.assert_not_called()
+    assert await _pending_count(worker_redis) == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fallback", [False, True])
+async def test_extracted_content_cache(worker_redis, mock_document_service, fallback):
+    """Test that genuine parser output is cached by PDF content while fallback output is not."""
+    async def parse(pdf_bytes):
+        return FallbackText("raw text") if fallback else "markdown"
+    mock_document_service.get_parser_function.return_value = parse
+    messages = await _read_jobs(worker_redis, {"job-1": b"first"})
+
+    await worker.handle_messages("consumer", messages)
+
+    cached = await worker_redis.get_llm_cache(worker.content_cache_key("pypdf", b"first"))
+    assert cached == (None if fallback else "markdown")